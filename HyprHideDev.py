@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import os
-import configparser
 import argparse
+import hyprhide_config
+import hyprhide_ops
 
 def get_version():
     version_path = '/usr/share/hyprhide/version.txt'
@@ -9,31 +10,24 @@ def get_version():
         return f.read().strip()
 
 VERSION = get_version()
-config = configparser.ConfigParser()
-user_config_path = os.path.expanduser("~/.config/hyprhide/config.cfg")
-
-if os.path.exists(user_config_path):
-    config.read(user_config_path)
-else:
-    os.mkdir(os.path.expanduser("~/.config/hyprhide/"))
-    with open(user_config_path,"w") as f:
-        # contents_to_write = "[DEV]\bdevmode"
-        print("Done")
-    # config.read(user_config_path)
-    # config.set("DEV","devmode",'False')
+hyprhide_config.ensure_user_config() # Also fine when ~/.config/hyprhide is only partly there
 
 def main():
-    IS_DEV_MODE = config.getboolean("DEV", "devmode", fallback=True)
-    run_file = config.get("DEV","hyprhide_src",fallback=None)
-    if(IS_DEV_MODE == True and run_file != None):
+    if hyprhide_ops.raise_picker(): # Already running: it reopens itself, near the mouse if configured
+        return
+    config = hyprhide_config.get()
+    run_file = config.hyprhide_src
+    if(config.devmode == True and run_file != None):
         
         # if(run_file == None):
         #     #Throw error
         #     pass
-        run_file_true = os.path.expanduser(run_file)
-        os.system(f"python {run_file_true} --launched --set-version {VERSION}-DEV")
+        run_file_true = os.path.abspath(os.path.expanduser(run_file)) # Hyprland runs it from its own cwd
+        args = ["python", run_file_true, "--launched", "--set-version", f"{VERSION}-DEV"]
     else:
-        os.system(f"hyprhide-gui-main --launched --set-version {VERSION}")
+        args = ["hyprhide-gui-main", "--launched", "--set-version", VERSION]
+    # Near the mouse if jump_to_mouse is on; Hyprland maps it there with one-shot exec rules
+    hyprhide_ops.launch_picker(args, hyprhide_ops.picker_rules(config))
 
 if __name__ == "__main__":
    
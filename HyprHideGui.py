@@ -1,233 +1,264 @@
 #!/usr/bin/env python3
 # Imports
-import os
-import json
-import subprocess
 import time
+_start = time.perf_counter() # Start of the imports phase in --trace output
+import os
 import sys
 import signal
-import configparser
 import commentjson
 import argparse
 import hyprland_interface
-from PyQt6.QtGui import QFont, QPixmap, QIcon, QCursor
+import hyprhide_config
+import hyprhide_log
+import hyprhide_ops
+import hyprhide_trace
+import hide_store
+import thumbnails
+import window_search
+from PyQt6.QtGui import QFont, QPixmap, QIcon, QImage, QPainter, QPen, QColor
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel,
-    QScrollArea,QCheckBox,QPushButton,QSpinBox, QGroupBox,QHBoxLayout
+    QCheckBox,QPushButton,QSpinBox, QGroupBox,QHBoxLayout,
+    QListView, QStyledItemDelegate, QStyle
 )
 from PyQt6.QtCore import (
-    Qt, QTimer, QPropertyAnimation, QEasingCurve,pyqtSignal
+    Qt, QTimer, pyqtSignal,
+    QObject, QRunnable, QThreadPool, QThread,
+    QAbstractListModel, QModelIndex, QPoint, QRect, QSize
 )
-from PyQt6.QtWidgets import QGraphicsOpacityEffect
-from PyQt6.QtWidgets import QLineEdit, QGridLayout
+from PyQt6.QtWidgets import QLineEdit
+from PyQt6.QtNetwork import QLocalServer
 
 #Default Version info
 VERSION = "1.9.8"
 
-#Setup config parser
-config = configparser.ConfigParser()
+log = hyprhide_log.get_logger("gui")
 
-#Expand config path
-user_config_path = os.path.expanduser("~/.config/hyprhide/config.cfg")
+#Load config; hyprhide_config.get() is cached by mtime, so use sites just call it
+hyprhide_ops.apply_config(hyprhide_config.get()) # Log level and the longest wait for Hyprland to apply a change
 
-#Ensure Path exists
-if os.path.exists(user_config_path):
-    config.read(user_config_path) # Load config path
-else:
-    #Print Error message
-    #Only known error here could be disk corruption
-    print("Please create a config.cfg file, or install this properly ")
 
-#Load some configs
-JUMP_TO_MOUSE = config.get('GUI', 'jump_to_mouse', fallback=False) # Should the GUI move to the mouse
-X_OFFSET = int(config.get('GUI', 'x_offset', fallback=-240)) # the x offset from the mouse(mouse_x+X_OFFSET)
-Y_OFFSET = int(config.get('GUI', 'y_offset', fallback=160)) # the y offset from the mouse(mouse_y+Y_OFFSET)
+HIDE_DIR = hide_store.HIDE_DIR # Dir where the index and .png files go
 
+# Thumbnails are decoded off the GUI thread so the picker paints straight away,
+# and kept decoded for the life of the process (every picker opened in it shares them)
+THUMBNAIL_CACHE = thumbnails.ThumbnailCache(max(1, hyprhide_config.get().thumbnail_cache_mb) * 1024 * 1024)
 
-HIDE_DIR = os.path.expanduser("~/.local/share/hypr-hide") # Dir where the .json and .png files go
+class _ThumbnailSignals(QObject):
+    done = pyqtSignal(object, QImage)
 
-# Internal Widget to display windows
-class HiddenWindowItem(QWidget):
-    restore_complete = pyqtSignal() # Signal that connects to exit system
-    def __init__(self, address, title, app_class, x, y, workspace,was_floating):
+class _ThumbnailTask(QRunnable):
+    def __init__(self, store, record, signals):
         super().__init__()
-        self.address = address # Window address to restore
-        self.x = x # X pos to put the window at
-        self.y = y # Y pos to put the window at
-        self.workspace = workspace # Workspace to put the window at
-        self.was_floating = was_floating # Wether or not the window was closed be
-        self.title = title # Title of the window
-        self.app_class = app_class # Class of the window
-
-        # Sleek card background with subtle border and hover effect
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #1e1e1e;
-                border: 1px solid #3a3a3a;
-                border-radius: 8px;
-                padding: 8px;
-            }
-            QWidget:hover {
-                border-color: #666666;
-                background-color: #2a2a2a;
-            }
-            QLabel#name_label {
-                color: #eeeeee;
-                font-weight: bold;
-                font-size: 11pt;
-            }
-            QLabel#title_label {
-                color: #bbbbbb;
-                font-size: 9pt;
-            }
-        """)
-        self.setWindowOpacity(0.95) # Make window slightly clear
-        self.setCursor(Qt.CursorShape.PointingHandCursor) # Set the cursor type
-
-        # Setup layout for window
-        layout = QVBoxLayout()
-        layout.setSpacing(6)
-        layout.setContentsMargins(6, 6, 6, 6)
-
-        # Name label (app class)
-        name_label = QLabel(app_class)
-        name_label.setObjectName("name_label")
-        name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        # layout.addWidget(name_label)
-
-        # Title label (window title)
-        title_label = QLabel(title)
-        title_label.setObjectName("title_label")
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        # layout.addWidget(title_label)
-
-        # Screenshot thumbnail centered
-        img_path = os.path.join(HIDE_DIR, f"{address}.png")
-        if os.path.exists(img_path):
-            pixmap = QPixmap(img_path).scaled(140, 105, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            img_label = QLabel()
-            img_label.setPixmap(pixmap)
-            img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        else:
-            img_label = QLabel(title)
-            img_label.setObjectName("title_label")
-            img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            # layout.addWidget(title_label)
-            # img_label = QLabel("[No Image]")
-            # img_label.setFixedSize(140, 105)
-            # img_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            img_label.setStyleSheet("color: #555555; font-style: italic;")
-
-        layout.addWidget(img_label)
-
-        self.setLayout(layout)
-
-        # Opacity effect for fade-in animation
-        self.opacity_effect = QGraphicsOpacityEffect(self)
-        self.setGraphicsEffect(self.opacity_effect)
-        self.opacity_anim = QPropertyAnimation(self.opacity_effect, b"opacity")
-        self.opacity_anim.setDuration(400)
-        self.opacity_anim.setStartValue(0.0)
-        self.opacity_anim.setEndValue(1.0)
-        self.opacity_anim.setEasingCurve(QEasingCurve.Type.InOutQuad)
-        self.opacity_anim.start()
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.on_restore_clicked()
-            self.close()
-            
-    # Run a command(Becoming Deprecated)
-    def run_cmd(self, cmd):
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.stdout.strip(), result.stderr.strip(), result.returncode
-    # Function to restore the window
-    def on_restore_clicked(self):
-        client_data = hyprland_interface.get_client_info(self.address) # Ge the current client info
-        print(f"Restoring window {self.title} at {self.x},{self.y} on workspace {self.workspace}") # Debug output
-        print(f"Window floating state = {self.was_floating}") # Debug output
-        window_floating_state_before_move = self.was_floating # Create variable for ease of read
-        print(self.workspace) # Print workspace window should go to
-        hyprland_interface.set_current_workspace(workspace=self.workspace) # Set current workspace
-        time.sleep(0.3) # Minor delay
-        hyprland_interface.focus_window(self.address) # Set the window to be restored into focus(Might be redundant)
-        time.sleep(0.3) # Minor delay
-        hyprland_interface.move_win_to_workspace(self.address,self.workspace) # Move window to workspace
-        test_data = hyprland_interface.get_client_info(self.address) # Grab current state of window
-        print(test_data["workspace"]) # Debug output
-        if(client_data['floating'] == False): # Check if window is floating(need to be to move)
-            hyprland_interface.toggle_floating(self.address) # Set window to floating
-        if(test_data["workspace"]['id'] != self.workspace): # Check if window is on right workspace(Edge cases can move)
-            print("Move again") # Debug output
-            hyprland_interface.move_win_to_workspace(self.address,self.workspace)# Move window to workspace again
-        hyprland_interface.focus_window(self.address) # Focus window once more
-        hyprland_interface.move_window_local(self.address,self.x,self.y) # Attempt to move window(Hyprland dose not seem to honor this always)
-
-        #|------------------------------------------------------------|#
-        #| Window is now considered restored. We now do safety checks.|#
-        #|------------------------------------------------------------|#
-        
-        if(self.was_floating != client_data['floating']): # Insure window is in initial state(tiled/floating)
-            hyprland_interface.toggle_floating(self.address) # If not, toggle it
-        client_data = hyprland_interface.get_client_info(self.address) # Ge the current client info(Second time)
-        if(self.was_floating != client_data['floating']): # Do another check
-            hyprland_interface.toggle_floating(self.address) # Toggle window if states dont match
-        
-        #|------------------------------------------------------------|#
-        #| Safety checks are done. Now we clean up.                   |#
-        #|------------------------------------------------------------|#
-        
-        json_path = os.path.join(HIDE_DIR, f"{self.address}.json") # Get path of json file
-        try:
-            os.remove(json_path) # Try remove it
-        except Exception as e:
-            print(f"Failed to remove {json_path}: {e}") # Error output
+        self.store = store
+        self.record = record
+        self.signals = signals
+
+    def run(self):
+        with hyprhide_trace.span("decode thumbnail", "thumbnail", address=self.record.address):
+            path = thumbnails.ensure_thumbnail(self.store, self.record) # Also makes missing thumbnails for old hides
+            image = QImage(path) if path else QImage() # QImage is safe off the GUI thread, QPixmap is not
+            if image.width() > thumbnails.THUMB_SIZE[0] or image.height() > thumbnails.THUMB_SIZE[1]:
+                # Only display sized images go in the cache
+                image = image.scaled(thumbnails.THUMB_SIZE[0], thumbnails.THUMB_SIZE[1],
+                                     Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self.signals.done.emit(self.record, image)
+
+class ThumbnailLoader(QObject):
+    loaded = pyqtSignal(str) # address, its pixmap is now in the cache
+    def __init__(self, store, parent=None, max_threads=2, cache=THUMBNAIL_CACHE):
+        super().__init__(parent)
+        self.store = store
+        self.cache = cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.max_threads = max_threads
+        self.pending = {} # address -> record, waiting for a free worker
+        self.in_flight = 0
+        self.visible_addresses = lambda: [] # Set by the owner; visible cards are decoded first
+        self.signals = _ThumbnailSignals()
+        self.signals.done.connect(self._on_done)
+
+    def pixmap(self, record):
+        return self.cache.get(thumbnails.cache_key(record))
+
+    def request(self, record):
+        self.pending[record.address] = record
+        self.pump()
+
+    def pump(self):
+        # Hand out work one job per free worker, visible cards first
+        if not self.pending:
+            return
+        order = [a for a in self.visible_addresses() if a in self.pending]
+        order += [a for a in self.pending if a not in order]
+        for address in order:
+            if self.in_flight >= self.max_threads:
+                return
+            self.in_flight += 1
+            self.pool.start(_ThumbnailTask(self.store, self.pending.pop(address), self.signals))
+
+    def _on_done(self, record, image):
+        self.in_flight -= 1
+        if not image.isNull():
+            pixmap = QPixmap.fromImage(image)
+            self.cache.put(thumbnails.cache_key(record), pixmap, pixmap.width() * pixmap.height() * pixmap.depth() // 8)
+            self.loaded.emit(record.address)
+        self.pump()
+
+# Restores run one at a time on a worker thread, so the picker keeps painting and
+# taking clicks while Hyprland applies them. Submitted records queue up in the
+# worker's event loop and are restored in click order.
+class RestoreWorker(QObject):
+    started = pyqtSignal(object) # record
+    finished = pyqtSignal(object, bool) # record, end state confirmed by the compositor
+    _submit = pyqtSignal(object)
 
-        img_path = os.path.join(HIDE_DIR, f"{self.address}.png") # Get path of thumbnail
+    def __init__(self):
+        super().__init__()
+        self.worker_thread = QThread()
+        self.moveToThread(self.worker_thread)
+        self._submit.connect(self._run) # Queued: the slot runs on worker_thread
+        self.worker_thread.start()
+
+    def submit(self, record):
+        self._submit.emit(record)
+
+    def stop(self):
+        # Lets a restore in progress finish, drops the rest
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+
+    @hyprhide_trace.traced("gui-restore")
+    def _run(self, record):
+        self.started.emit(record)
+        confirmed = False
         try:
-            if os.path.exists(img_path): # Check if it exists
-                os.remove(img_path) # Remove it
+            log.debug("Restoring window %s at %s,%s on workspace %s (floating=%s)",
+                      record.title, record.x, record.y, record.workspace, record.floating)
+            # Only the dispatches the window needs, in one batch; restore_record
+            # verifies the result and corrects it if Hyprland didn't apply it
+            client = hyprhide_ops.restore_record(record)
+            confirmed = hyprhide_ops.restore_confirmed(record, client)
+            hyprhide_ops.forget_hidden(record.address, HIDE_DIR) # Remove the index record and thumbnail
         except Exception as e:
-            print(f"Failed to remove screenshot {img_path}: {e}") # Error output
-
-        print("Restore complete.") # Output
-
-        # One more final floating/tiled safety check
-        check_state_c = hyprland_interface.get_client_info(self.address) # get window info
-        window_floating_state_after_move = check_state_c['floating'] # Get current floating state
-        if(window_floating_state_after_move == window_floating_state_before_move): # check if they match
-            print("I did this right") # Positive Affirmations
+            log.error("Restoring %s failed: %s", record.address, e)
+        self.finished.emit(record, confirmed)
+
+# Hidden windows, one row per record, with decoded thumbnails attached as they arrive
+class HiddenWindowModel(QAbstractListModel):
+    RecordRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, loader, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.records = [] # Every hidden window
+        self.rows = [] # Indexes into records that match the current search, best first
+        self.search_index = window_search.SearchIndex() # Not "index": that would shadow QAbstractListModel.index()
+        self.query = ""
+        self.requested = set() # Decodes asked for and not delivered; failed ones stay so they aren't retried
+        loader.loaded.connect(self.on_thumbnail_loaded)
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self.records = list(records)
+        self.search_index.rebuild(self.records)
+        self.rows = self.search_index.search(self.query)
+        self.endResetModel()
+
+    def set_filter(self, text):
+        self.query = text
+        rows = self.search_index.search(text)
+        if rows == self.rows:
+            return # Nothing to repaint
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def record(self, row):
+        return self.records[self.rows[row]]
+
+    def remove_address(self, address):
+        for row in range(len(self.rows)):
+            if self.record(row).address == address:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                removed = self.rows.pop(row)
+                self.rows = [i - 1 if i > removed else i for i in self.rows]
+                del self.records[removed]
+                self.search_index.rebuild(self.records)
+                self.endRemoveRows()
+                return
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.record(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return record.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{record.app_class}: {record.title}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            pixmap = self.loader.pixmap(record)
+            if pixmap is None and record.address not in self.requested:
+                # Only cells that get painted ask for their thumbnail
+                self.requested.add(record.address)
+                self.loader.request(record)
+            return pixmap
+        if role == self.RecordRole:
+            return record
+        return None
+
+    def on_thumbnail_loaded(self, address):
+        self.requested.discard(address) # If it gets evicted, painting it asks again
+        for row in range(len(self.rows)):
+            if self.record(row).address == address:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+                return
+
+# Paints a card per cell; replaces a QWidget + stylesheet + opacity effect per window
+class HiddenWindowDelegate(QStyledItemDelegate):
+    CARD_SIZE = QSize(thumbnails.THUMB_SIZE[0] + 16, thumbnails.THUMB_SIZE[1] + 16)
+
+    def sizeHint(self, option, index):
+        return self.CARD_SIZE
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(QPen(QColor("#666666" if hovered else "#3a3a3a"), 1))
+        painter.setBrush(QColor("#2a2a2a" if hovered else "#1e1e1e"))
+        painter.drawRoundedRect(rect, 8, 8)
+
+        inner = rect.adjusted(7, 7, -7, -7)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(inner.center())
+            painter.drawPixmap(target, pixmap)
         else:
-            hyprland_interface.toggle_floating(self.address) # Final attempt at setting the toggle state
+            # Title placeholder until the thumbnail is decoded (or when there is none)
+            font = painter.font()
+            font.setItalic(True)
+            painter.setFont(font)
+            painter.setPen(QColor("#555555"))
+            painter.drawText(inner, Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap,
+                             index.data(Qt.ItemDataRole.DisplayRole))
+        painter.restore()
 
-        print(f"Window floating state = {check_state_c['floating']}")# Output floating state
-        hyprland_interface.move_win_to_workspace(self.address,self.workspace) # One final move to correct workspace
-        self.restore_complete.emit() # Emit completion code
 
-    
-def get_focused_monitor_geometry():
-    result = subprocess.run("hyprctl monitors -j", shell=True, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"hyprctl error: {result.stderr}")
-        return {"x": 0, "y": 0, "width": 1920, "height": 1080}  # fallback
-
-    monitors = json.loads(result.stdout)
-    for monitor in monitors:
-        if monitor.get("focused", False):
-            return {
-                "x": monitor["x"],
-                "y": monitor["y"],
-                "width": monitor["width"],
-                "height": monitor["height"]
-            }
-    
-    return {"x": 0, "y": 0, "width": 1920, "height": 1080}  # fallback
 class HyprHideApp(QWidget):
+    restore_complete = pyqtSignal() # Signal that connects to exit system
     def __init__(self):
         super().__init__()
         self.title = f"HyprHide {VERSION}"
         self.setWindowTitle(self.title)
-        self.setFixedSize(460, 500)
+        self.setFixedSize(*hyprhide_ops.PICKER_SIZE) # The launcher places it by this size
         self.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
         self.setWindowFlag(Qt.WindowType.Tool)
 
@@ -239,188 +270,239 @@ class HyprHideApp(QWidget):
         # 🔍 Search bar
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search hidden windows...")
-        self.search_bar.textChanged.connect(self.filter_items)
+        self.search_bar.textChanged.connect(self.on_search_changed)
+        self.search_bar.returnPressed.connect(self.restore_top_hit)
+        # Typing restarts this, so a burst of keystrokes costs one search
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(40)
+        self.search_timer.timeout.connect(lambda: self.filter_items(self.search_bar.text()))
         self.layout.addWidget(self.search_bar)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.layout.addWidget(self.scroll_area)
-
-        self.content_widget = QWidget()
-        self.grid_layout = QGridLayout()
-        self.grid_layout.setSpacing(10)
-        self.grid_layout.setContentsMargins(8, 8, 8, 8)
-        self.content_widget.setLayout(self.grid_layout)
-
-        self.scroll_area.setWidget(self.content_widget)
-
-        self.window_items = []
+        # Restore progress; hidden while nothing is queued
+        self.status_label = QLabel()
+        self.status_label.setVisible(False)
+        self.layout.addWidget(self.status_label)
+
+        self.empty_label = QLabel("No hidden windows")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
+        self.layout.addWidget(self.empty_label)
+
+        self.thumbnail_loader = ThumbnailLoader(hide_store.get_store(HIDE_DIR), self)
+        self.model = HiddenWindowModel(self.thumbnail_loader, self)
+
+        # Icon mode grid; only the cells in the viewport are ever painted
+        self.view = QListView()
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setSpacing(5)
+        self.view.setMouseTracking(True) # Hover highlight
+        self.view.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.view.setItemDelegate(HiddenWindowDelegate(self.view))
+        self.view.setModel(self.model)
+        self.view.clicked.connect(self.on_item_clicked)
+        self.layout.addWidget(self.view)
+
+        self.thumbnail_loader.visible_addresses = self.visible_addresses
+        self.view.verticalScrollBar().valueChanged.connect(self.thumbnail_loader.pump)
+        self.restore_complete.connect(self.close)
+        self.restore_worker = RestoreWorker()
+        self.restore_worker.started.connect(self.on_restore_started)
+        self.restore_worker.finished.connect(self.on_restore_finished)
+        self.queued = [] # Submitted, not finished yet
+        self.failed = [] # Finished without the compositor confirming
+        self.resident = False # Set by ReopenServer: closing parks the picker instead of quitting
+        self.parked = False
         self.load_hidden_windows()
 
-        # QTimer.singleShot(10, self.position_near_mouse)
-
     def load_hidden_windows(self):
-        self.window_items.clear()
-        for i in reversed(range(self.grid_layout.count())):
-            self.grid_layout.itemAt(i).widget().setParent(None)
+        records = hide_store.get_store(HIDE_DIR).all() # One query, no per-window file reads
+        self.model.set_records(records)
+        self.empty_label.setVisible(not records)
+        self.view.setVisible(bool(records))
+
+    def visible_addresses(self):
+        # Cells currently inside the viewport, in model order. Icon mode lays them
+        # out row by row, so that is every row from the cell at the top-left corner
+        # to the one at the bottom-right: a few indexAt() probes however long the list
+        count = self.model.rowCount()
+        if not count:
+            return []
+        viewport = self.view.viewport().rect()
+        cell = self.view.visualRect(self.model.index(0)) # Uniform sizes; gives column 0's x
+        gap = self.view.spacing() + 1 # A corner can sit in the spacing between cells
+        pitch = cell.width() + self.view.spacing()
+        columns = max(1, (viewport.width() - self.view.spacing()) // pitch)
+        first = self._index_at(cell.center().x(), (viewport.top(), viewport.top() + gap))
+        # The bottom-right corner is usually in empty space: right of the last column
+        # or, when the list is short, below the last cell
+        last = None
+        for column in range(columns - 1, -1, -1):
+            last = self._index_at(cell.center().x() + column * pitch, (viewport.bottom(), viewport.bottom() - gap))
+            if last is not None:
+                break
+        first = 0 if first is None else first
+        last = count - 1 if last is None else last
+        return [self.model.record(row).address for row in range(first, last + 1)]
+
+    def _index_at(self, x, ys):
+        for y in ys:
+            index = self.view.indexAt(QPoint(x, y))
+            if index.isValid():
+                return index.row()
+        return None
+
+    def on_search_changed(self, text):
+        self.search_timer.start()
 
-        if not os.path.exists(HIDE_DIR):
-            os.makedirs(HIDE_DIR)
-
-        files = [f for f in os.listdir(HIDE_DIR) if f.endswith(".json")]
-
-        if not files:
-            label = QLabel("No hidden windows")
-            label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            self.grid_layout.addWidget(label, 0, 0)
-        else:
-            row, col = 0, 0
-            for file in files:
-                try:
-                    with open(os.path.join(HIDE_DIR, file)) as f:
-                        data = json.load(f)
-                        item = HiddenWindowItem(
-                            address=data['address'],
-                            title=data['title'],
-                            app_class=data['class'],
-                            x=data['at'][0],
-                            y=data['at'][1],
-                            workspace=data['workspace']['id'],
-                            was_floating=data['floating']
-                        )
-                        item.restore_complete.connect(self.close) 
-                        self.window_items.append(item)
-                        self.grid_layout.addWidget(item, row, col)
-                        col += 1
-                        if col >= 3:
-                            row += 1
-                            col = 0
-                except Exception as e:
-                    print(f"Error loading {file}: {e}")
-        self.close()
-        
     def filter_items(self, text):
-        text = text.lower()
-        for i in range(self.grid_layout.count()):
-            item = self.grid_layout.itemAt(i).widget()
-            visible = text in item.title.lower() or text in item.app_class.lower()
-            item.setVisible(visible)
+        self.search_timer.stop()
+        self.model.set_filter(text)
+        self.thumbnail_loader.pump() # What is on screen changed, re-order pending thumbnails
+
+    def restore_top_hit(self):
+        if self.search_timer.isActive(): # Enter before the debounce fired
+            self.filter_items(self.search_bar.text())
+        if self.model.rowCount() > 0:
+            self.restore_record(self.model.record(0))
+
+    def on_item_clicked(self, index):
+        self.restore_record(index.data(HiddenWindowModel.RecordRole))
+
+    # Queue a window for restoring; the card goes away straight away so it can't be queued twice
+    def restore_record(self, record):
+        self.queued.append(record.address)
+        self.model.remove_address(record.address)
+        self.update_status()
+        self.restore_worker.submit(record)
+
+    def on_restore_started(self, record):
+        self.update_status(record)
+
+    def on_restore_finished(self, record, confirmed):
+        self.queued.remove(record.address)
+        if confirmed:
+            log.info("Restored %s", record.address) # Output
+        else:
+            log.warning("Restore of %s was not confirmed by Hyprland", record.address)
+            self.failed.append(record)
+        self.update_status()
+        if not self.queued and not self.failed:
+            self.restore_complete.emit() # Every restore landed, emit completion code
+
+    def update_status(self, current=None):
+        if current is not None:
+            text = f"Restoring {current.title or current.address}..."
+            if len(self.queued) > 1:
+                text += f" ({len(self.queued) - 1} queued)"
+        elif self.queued:
+            text = f"Restoring {len(self.queued)} window(s)..."
+        elif self.failed:
+            text = f"Could not confirm: {', '.join(r.title or r.address for r in self.failed)}"
+        else:
+            text = ""
+        self.status_label.setText(text)
+        self.status_label.setVisible(bool(text))
+        self.empty_label.setVisible(self.model.rowCount() == 0 and not self.queued)
 
     def closeEvent(self, event):
+        log.debug("Thumbnail cache: %s", THUMBNAIL_CACHE.stats())
+        if self.resident:
+            event.ignore()
+            self.park()
+            return
+        self.restore_worker.stop()
         QApplication.quit()
 
-    def position_near_mouse(self):
-        # if not self.isVisible():
-        #     QTimer.singleShot(10, self.position_near_mouse)
-        #     return
-
-        pos = QCursor.pos()  # Global mouse pos
-        monitor = get_focused_monitor_geometry()
-
-        win_width = self.frameGeometry().width()
-        win_height = self.frameGeometry().height()
-
-        # Offset adjustments
-        frame_offset_x = self.frameGeometry().x() - self.geometry().x()
-
-        # Clamp mouse position to monitor bounds
-        mouse_x = min(max(pos.x(), monitor["x"]), monitor["x"] + monitor["width"] - 1)
-        mouse_y = min(max(pos.y(), monitor["y"]), monitor["y"] + monitor["height"] - 1)
-
-        if JUMP_TO_MOUSE == 'True':
-            adjusted_x = mouse_x - frame_offset_x + X_OFFSET - 240
-
-            adjusted_y = mouse_y + (win_height // 4) + Y_OFFSET
-
-            # Clamp inside monitor bounds
-            adjusted_x = max(monitor["x"], min(adjusted_x, monitor["x"] + monitor["width"] - win_width))
-            adjusted_y = max(monitor["y"], min(adjusted_y, monitor["y"] + monitor["height"] - win_height))
-
-            # print(f"Monitor bounds: {monitor}")
-            # print(f"Adjusted X: {adjusted_x}, Adjusted Y: {adjusted_y}")
-            # print(f"Moving screen to {adjusted_x},{adjusted_y}")
-            # print(f"Mouse at {mouse_x},{mouse_y}")
-
-            # result = subprocess.run(f"hyprctl dispatch moveactive {adjusted_x} {adjusted_y}",
-            #                         shell=True, capture_output=True, text=True)
-            # if result.returncode != 0:
-            #     print(f"hyprctl error: {result.stderr}")
-            hyprhide_window = hyprland_interface.get_window_by_class_and_title(title=self.title,class_in="python3")
-            address_to_use = hyprhide_window['address']
-            active_workspace = hyprland_interface.get_active_workspace_id()
-            # hyprland_interface.move_win_to_workspace(address_to_use,active_workspace)
-            # hyprland_interface.set_current_workspace(active_workspace)
-            print("Move to mouse")
-            # active_workspace = hyprland_interface.get_active_workspace_id()
-            hyprland_interface.move_window_global(address_to_use,pos.x(),pos.y(),active_workspace)
-
-
-def insure_no_leftover_file():
-    directory = HIDE_DIR
-    files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
-
-    json_files = []
-    for f in files:
-        _, extension = os.path.splitext(f)
-        if extension == '.json':
-            json_files.append(f)
-
-    clients = hyprland_interface.get_clients()
-    client_files = [f"{i['address']}.json" for i in clients]
-
-    for jf in json_files:
-        if jf not in client_files:
-            # Delete JSON file
-            json_path = os.path.join(HIDE_DIR, jf)
-            os.remove(json_path)
-
-            # Delete corresponding PNG file
-            name, _ = os.path.splitext(jf)
-            png_path = os.path.join(HIDE_DIR, f"{name}.png")
-            if os.path.exists(png_path):
-                os.remove(png_path)
-
-
-
-def safety_check_generate_missing_json_files():
-    threshold = 900  # pixels around (5000, 5000)
+    # A resident picker is parked on its own special workspace rather than hidden:
+    # a window that unmaps comes back as a new one, without the float rule it was
+    # launched with. Reopening brings it back with one batch.
+    def park(self):
+        selector = f"pid:{os.getpid()}"
+        replies = hyprland_interface.DispatchBatch().add(
+            f"movetoworkspacesilent {hyprhide_ops.PICKER_WORKSPACE}, {selector}").flush()
+        self.parked = [reply.strip() for reply in replies] == ["ok"]
+        if not self.parked:
+            self.hide() # Not under Hyprland, or it didn't take
+
+    def reopen(self, position=None):
+        with hyprhide_trace.span("reopen", "gui"):
+            reconcile_hidden()
+            self.failed.clear()
+            self.search_bar.clear()
+            self.filter_items("")
+            self.load_hidden_windows() # One query; thumbnails come from THUMBNAIL_CACHE
+            self.update_status()
+            if self.parked:
+                self.unpark(position)
+            self.show()
+            self.raise_()
+            self.activateWindow()
+            self.search_bar.setFocus()
+
+    def unpark(self, position=None):
+        config = hyprhide_config.get()
+        if position is None and config.jump_to_mouse:
+            position = hyprhide_ops.picker_position(config, hyprland_interface.get_cursor_pos(),
+                                                    hyprland_interface.get_monitor_layout())
+        selector = f"pid:{os.getpid()}"
+        with hyprland_interface.DispatchBatch() as batch:
+            batch.add(f"movetoworkspacesilent {hyprland_interface.get_active_workspace_id()}, {selector}")
+            if position is not None:
+                batch.add(f"movewindowpixel exact {position[0]} {position[1]}, {selector}")
+            batch.add(f"focuswindow {selector}")
+        self.parked = False
+
+# Launchers (hyprhided, hyprhide-gui, hyprhidectl) send "show [x y]" here instead
+# of starting another picker; see hyprhide_ops.raise_picker
+class ReopenServer(QObject):
+    def __init__(self, window, path=None):
+        super().__init__(window)
+        self.window = window
+        self.path = path or hyprhide_ops.picker_socket_path()
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._on_connection)
+
+    def listen(self):
+        QLocalServer.removeServer(self.path) # Left by a picker that died; a live one was asked first
+        if not self.server.listen(self.path):
+            log.warning("Could not listen on %s: %s", self.path, self.server.errorString())
+            return False
+        self.window.resident = True
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+        return True
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            conn = self.server.nextPendingConnection()
+            conn.readyRead.connect(lambda conn=conn: self._on_ready(conn))
+            conn.disconnected.connect(conn.deleteLater)
+
+    def _on_ready(self, conn):
+        if not conn.canReadLine():
+            return
+        name, *args = bytes(conn.readLine()).decode(errors="replace").split() or [""]
+        try:
+            if name != "show" or len(args) not in (0, 2):
+                raise ValueError(f"unknown request {name!r}")
+            self.window.reopen((int(args[0]), int(args[1])) if args else None)
+            conn.write(b"ok\n")
+        except Exception as e: # Raising out of a slot would abort the picker
+            log.error("Reopen request failed: %s", e)
+            conn.write(b"error\n")
+        conn.flush()
+        conn.disconnectFromServer()
+
+
+def reconcile_hidden():
+    # One client snapshot and one listing of HIDE_DIR for the whole startup check
     try:
-        output = subprocess.check_output(["hyprctl", "clients", "-j"], text=True)
-        clients = json.loads(output)
-        far_clients = [
-        c for c in clients
-            if c["at"][0] > 5000 or c["at"][1] > 5000
-        ]
-        for client in far_clients:
-            self.address = client.get("address")
-            x, y = client.get("at", [0, 0])
-            title = client.get("title", "Unknown")
-            app_class = client.get("class", "Unknown")
-            workspace = client.get("workspace", {}).get("id", 1)
-            floating = client.get("floating", False)
-
-
-            json_path = os.path.join(HIDE_DIR, f"{self.address}.json")
-            if os.path.exists(json_path):
-                continue
-
-            # Check if window is near (5000, 5000)
-            os.makedirs(HIDE_DIR, exist_ok=True)
-            data = {
-                "address": self.address,
-                "title": title,
-                "class": app_class,
-                "at": [x, y],
-                "workspace": {"id": workspace},
-                "floating":floating
-            }
-            print(data)
-            with open(json_path, "w") as f:
-                json.dump(data, f, indent=2)
-            print(f"[Safety Check] Created rudimentary file for: {self.address}")
-
+        hyprhide_ops.reconcile(hyprland_interface.get_clients(), HIDE_DIR)
     except Exception as e:
-        print(f"[Safety Check] Failed to check or create json: {e}")
+        log.error("[Safety Check] Failed to reconcile hidden windows: %s", e)
 
 class HyprHideAppInitWindow(QWidget):
     def __init__(self):
@@ -576,7 +658,7 @@ class HyprHideAppInitWindow(QWidget):
     def toggle_dev_path_option(self,state):
         self.dev_path_input.setEnabled(state == 2)
     def toggle_keybind_input(self, state):
-        print("HELLI",state)
+        log.debug("Keybind option toggled: %s", state)
         self.keybind_input.setEnabled(state == 2)
     def toggle_offset_inputs(self,state):
         self.x_offset.setEnabled(state == 2)
@@ -597,6 +679,8 @@ class HyprHideAppInitWindow(QWidget):
                 else:
                     line = f"bind = SUPER,H,exec,hyprhide-min"
             data = data+"\n"+line
+            if "hyprhided" not in data:
+                data = data+"\nexec-once = hyprhided" # Resident daemon, makes hyprhide-min near instant
         with open(hyprcfg,"w") as hypr_file:
             hypr_file.write(data)
         os.system("hyprctl")
@@ -605,13 +689,13 @@ class HyprHideAppInitWindow(QWidget):
         waybar_modules_c = os.path.expanduser("~/.config/waybar/modules/modules-custom.jsonc")
 
         if not os.path.exists(waybar_cfg):
-            print(f"Broken: No cfg at {waybar_cfg}")
+            log.warning("Broken: No cfg at %s", waybar_cfg)
             return -1
         if not os.path.exists(waybar_modules_c):
-            print(f"Broken: No modules at {waybar_modules_c}")
+            log.warning("Broken: No modules at %s", waybar_modules_c)
             return -1
 
-        print("Install")
+        log.debug("Install")
 
         # Use commentjson to load config with comments/trailing commas
         with open(waybar_cfg, "r") as waybar_cfg_file:
@@ -619,7 +703,7 @@ class HyprHideAppInitWindow(QWidget):
 
         modules_right = waybar_json.get('modules-right', [])
         if not modules_right:
-            print("No modules-right found in waybar config")
+            log.warning("No modules-right found in waybar config")
             return -1
 
         modules_first = modules_right[0]
@@ -639,10 +723,9 @@ class HyprHideAppInitWindow(QWidget):
 
         # Add your custom/hyprhide module config
         waybar_modules_c_json['custom/hyprhide'] = {
-            "exec": "echo '🗔'",  # Button label (icon)
-            "interval": 0,
-            "on-click": "python3 /usr/bin/hyprhide-gui",
-            "tooltip-format": "Press to see all hidden windows"
+            "exec": "hyprhide waybar",  # Icon + hidden count, a new line only when it changes
+            "return-type": "json",
+            "on-click": "hyprhidectl show-gui || python3 /usr/bin/hyprhide-gui",
         }
 
         # Write updated modules-custom.jsonc back
@@ -650,7 +733,7 @@ class HyprHideAppInitWindow(QWidget):
             commentjson.dump(waybar_modules_c_json, mod_file, indent=4)
 
     def save_config_and_launch(self):
-        os.makedirs(os.path.dirname(user_config_path), exist_ok=True)
+        config = hyprhide_config.editable()
 
         config["INIT"] = {"first": "False"}
         config["GUI"] = {
@@ -663,23 +746,22 @@ class HyprHideAppInitWindow(QWidget):
 
         
         if(self.cb_waybar.isChecked() == True):
-            print("Installing")
+            log.debug("Installing")
             self.install_into_waybar()
         if(self.cb_hyprland.isChecked() ==  True):
             self.install_into_hyprland()
         if self.cb_developer_mode.isChecked() == True:
             if not config.has_section("DEV"):
                 config.add_section("DEV")
-            print("Setting this")
+            log.debug("Setting this")
             config.set("DEV","devmode",'True')
             deb_path = self.dev_path_input.text()
             config.set("DEV","hyprhide_src",deb_path)
-            print(config.get("DEV","devmode",fallback="Know it"))
-        with open(user_config_path, "w") as cfgfile:
-            config.write(cfgfile)
+            log.debug("devmode %s", config.get("DEV","devmode",fallback="Know it"))
+        hyprhide_config.save(config)
         self.close()
         self.main_app = HyprHideApp()
-        self.main_app.position_near_mouse()
+        ReopenServer(self.main_app).listen()
         self.main_app.show()
 
 if __name__ == "__main__":
@@ -688,33 +770,36 @@ if __name__ == "__main__":
     parser.add_argument("--reset", action="store_true", help="Reset initial setup")
     parser.add_argument("--launched", action="store_true", help="Used internally")
     parser.add_argument("--set-version", type=str, help="Specify the version")
+    parser.add_argument("--trace", type=str, metavar="OUT_JSON", help="Write a Chrome trace of this run on exit")
     
     args = parser.parse_args()
+    if args.trace:
+        hyprhide_trace.enable(args.trace)
+        hyprhide_trace.record_span("imports", "startup", _start, time.perf_counter())
     VERSION = args.set_version
     if(args.launched != True):
         exit()
-    if args.reset:
-         
-         config.set("INIT", "first", True)
-    first_run = config.getboolean("INIT","first",fallback=True)
+    first_run = args.reset or hyprhide_config.get().first_run
     if(first_run == True):
         app = QApplication(sys.argv)
         signal.signal(signal.SIGINT, signal.SIG_DFL)
         # safety_check_generate_missing_json_files()
         window = HyprHideAppInitWindow()
-        # Immediately move near mouse
-        # window.position_near_mouse()
         window.show()
         sys.exit(app.exec())
     else:
-
-        app = QApplication(sys.argv)
+        if hyprhide_ops.raise_picker(): # One is already resident, and has reopened
+            sys.exit(0)
+        with hyprhide_trace.span("QApplication", "startup"):
+            app = QApplication(sys.argv)
         signal.signal(signal.SIGINT, signal.SIG_DFL)
-        insure_no_leftover_file()
-        safety_check_generate_missing_json_files()
-        window = HyprHideApp()
-        # Immediately move near mouse
-        window.position_near_mouse()
-        window.show()
+        reconcile_hidden()
+        with hyprhide_trace.span("HyprHideApp()", "startup"):
+            window = HyprHideApp()
+        ReopenServer(window).listen() # Closing it from now on parks it for the next show-gui
+        # Placement near the mouse is done by the launcher (hyprhided, hyprhide-gui)
+        # with exec rules, so the window maps where it belongs
+        with hyprhide_trace.span("show", "startup"):
+            window.show()
         sys.exit(app.exec())
 #0x56090b1d9f60
\ No newline at end of file
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# Latency benchmark for hide, restore and opening and reopening the picker, run against
+# hyprland_fake so it needs no compositor (the GUI runs with
+# QT_QPA_PLATFORM=offscreen). Per operation it reports wall time, Hyprland
+# round trips and time spent in wait_until polls.
+#
+#   python benchmark.py --clients 50 --latency 2 --runs 10
+#   python benchmark.py --transport hyprctl   # go through a fake hyprctl binary instead
+#   python benchmark.py --json > baseline.json
+#   python benchmark.py --trace bench.json     # open in chrome://tracing or Perfetto
+#
+# HOME points at a temporary directory for the whole run, so the real hidden
+# window index is never touched.
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="hyprhide-bench-home-") # Before anything reads HIDE_DIR
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+import hyprland_fake
+import hyprland_interface
+import hyprland_ipc
+import hyprhide_ops
+import hyprhide_trace
+
+FAKE_HYPRCTL = """#!/usr/bin/env python3
+import os, socket, sys
+args = sys.argv[1:]
+if args[:1] == ["-j"]:
+    message = "j/" + " ".join(args[1:])
+elif args[:1] == ["--batch"]:
+    message = "[[BATCH]]" + " ".join(args[1:])
+else:
+    message = " ".join(args)
+with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    sock.connect(os.environ["HYPRHIDE_FAKE_SOCKET"])
+    sock.sendall(message.encode())
+    sys.stdout.write(sock.makefile("r").read())
+"""
+
+
+class Bench:
+    def __init__(self, fake, runs):
+        self.fake = fake
+        self.runs = runs
+        self.results = {}
+
+    def measure(self, name, operation, setup=None):
+        # operation() may return the seconds it spent waiting if it can't be read
+        # from hyprland_interface.wait_total (i.e. it ran in another process)
+        samples = []
+        for _ in range(self.runs):
+            if setup is not None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    setup()
+            self.fake.reset_counters()
+            hyprland_interface.get_snapshot().invalidate()
+            waited_before = hyprland_interface.wait_total
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                waited = operation()
+            wall = time.perf_counter() - start
+            if not isinstance(waited, float):
+                waited = hyprland_interface.wait_total - waited_before
+            samples.append((wall, self.fake.request_count, waited))
+        walls = [s[0] * 1000 for s in samples]
+        self.results[name] = {
+            "runs": len(samples),
+            "wall_ms_median": statistics.median(walls),
+            "wall_ms_max": max(walls),
+            "round_trips": statistics.median(s[1] for s in samples),
+            "waited_ms_median": statistics.median(s[2] * 1000 for s in samples),
+        }
+
+    def report(self):
+        print(f"{'operation':<17}{'runs':>6}{'median ms':>12}{'max ms':>10}{'round trips':>13}{'waited ms':>11}")
+        for name, r in self.results.items():
+            print(f"{name:<17}{r['runs']:>6}{r['wall_ms_median']:>12.2f}{r['wall_ms_max']:>10.2f}"
+                  f"{r['round_trips']:>13g}{r['waited_ms_median']:>11.2f}")
+
+
+def focus_first_visible(fake):
+    hidden = hyprhide_ops.load_hidden()
+    for client in fake.clients:
+        if client["address"] not in hidden and client["workspace"]["id"] == fake.active_workspace:
+            hyprland_interface.focus_window(client["address"])
+            return
+
+
+def bench_hide_restore(bench, fake):
+    state = {}
+    def hide():
+        state["address"] = hyprhide_ops.hide_active_window()
+    def restore():
+        hyprhide_ops.restore_hidden(hyprhide_ops.load_hidden()[state["address"]])
+    def focus_and_hide():
+        focus_first_visible(fake) # Focus stays on the window just hidden, which won't hide twice
+        hide()
+    bench.measure("hide", hide, setup=lambda: focus_first_visible(fake))
+    # Each restore needs something hidden first
+    bench.measure("restore", restore, setup=focus_and_hide)
+
+
+def bench_bulk(bench, fake):
+    def hide_all():
+        clients = [c for c in hyprland_interface.get_clients() if c.workspace == 1]
+        hyprhide_ops.hide_many(clients)
+    def restore_all():
+        hyprhide_ops.restore_many(hide_store_records())
+    bench.measure("bulk-hide", hide_all, setup=restore_all)
+    bench.measure("bulk-restore", restore_all, setup=hide_all)
+    with contextlib.redirect_stdout(io.StringIO()):
+        restore_all()
+
+
+def hide_store_records():
+    return list(hyprhide_ops.load_hidden().values())
+
+
+def bench_min_cli(bench, fake, env):
+    # The whole hyprhide-min fallback, interpreter start included
+    def run():
+        result = subprocess.run([sys.executable, os.path.join(REPO_DIR, "min.py"), "--timings"],
+                                env=env, capture_output=True, text=True, cwd=REPO_DIR)
+        if result.returncode == 3: # Over STARTUP_BUDGET_MS
+            sys.stderr.write(result.stderr)
+        for line in result.stdout.splitlines():
+            if line.strip().startswith("waited:"):
+                return float(line.split()[1]) / 1000
+        return 0.0
+    bench.measure("min.py", run, setup=lambda: (hyprhide_ops.restore_many(hide_store_records()),
+                                                focus_first_visible(fake)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        hyprhide_ops.restore_many(hide_store_records())
+
+
+def seed_hidden_with_thumbnails(fake):
+    # Every workspace 1 window hidden, each with a display sized thumbnail
+    # (grim isn't there to capture one, so it is drawn)
+    from PyQt6.QtGui import QColor, QImage
+    import hide_store
+    import thumbnails
+    hidden = hyprhide_ops.load_hidden()
+    hyprhide_ops.hide_many([c for c in hyprland_interface.get_clients()
+                            if c.workspace == 1 and c.address not in hidden])
+    store = hide_store.get_store()
+    for record in store.all():
+        name = thumbnails.thumbnail_name(record.address)
+        if record.thumbnail != name:
+            image = QImage(thumbnails.THUMB_SIZE[0], thumbnails.THUMB_SIZE[1], QImage.Format.Format_RGB32)
+            image.fill(QColor("#3070b0"))
+            image.save(os.path.join(store.hide_dir, name), "PPM")
+            store.set_thumbnail(record.address, name)
+    return len(store)
+
+
+def bench_gui_open(bench, fake):
+    # Time to first paint of a populated picker: reconcile, build, show, and
+    # event processing until every card in view has its thumbnail painted.
+    # The decoded-thumbnail cache is emptied first, as in a freshly started picker.
+    try:
+        from PyQt6.QtWidgets import QApplication
+        with contextlib.redirect_stdout(io.StringIO()):
+            import HyprHideGui
+    except ImportError as e:
+        print(f"Skipping gui-open: {e}", file=sys.stderr)
+        return
+    app = QApplication.instance() or QApplication([])
+    with contextlib.redirect_stdout(io.StringIO()):
+        count = seed_hidden_with_thumbnails(fake)
+    if not count:
+        print("Skipping gui-open: nothing to show", file=sys.stderr)
+        return
+    def open_gui():
+        HyprHideGui.reconcile_hidden()
+        window = HyprHideGui.HyprHideApp()
+        window.show()
+        loader = window.thumbnail_loader
+        def painted():
+            visible = set(loader.visible_addresses())
+            return visible and all(loader.pixmap(window.model.record(row)) is not None
+                                   for row in range(window.model.rowCount())
+                                   if window.model.record(row).address in visible)
+        deadline = time.monotonic() + 5
+        while not painted():
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"gui-open: thumbnails not painted after 5 s ({window.model.rowCount()} rows)")
+            app.processEvents()
+        app.processEvents() # The repaint the last decode queued
+        window.hide()
+        window.restore_worker.stop()
+        window.deleteLater()
+    bench.measure(f"gui-open ({count})", open_gui, setup=HyprHideGui.THUMBNAIL_CACHE.clear)
+    bench_gui_reopen(bench, fake, app, HyprHideGui, count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        hyprhide_ops.restore_many(hide_store_records())
+
+
+def bench_gui_reopen(bench, fake, app, HyprHideGui, count):
+    # What show-gui costs once the picker is resident: from the request on its
+    # socket to the reply, with every card in view painted. The picker is a fake
+    # client (found by pid) so parking and unparking go through Hyprland.
+    import threading
+    fake.clients.append(hyprland_fake.make_client("0xfff000", "HyprHide", "hyprhide", at=(300, 200),
+                                                  size=hyprhide_ops.PICKER_SIZE, floating=True, pid=os.getpid()))
+    window = HyprHideGui.HyprHideApp()
+    server = HyprHideGui.ReopenServer(window, os.path.join(tempfile.mkdtemp(prefix="hyprhide-bench-gui-"), "gui.sock"))
+    server.listen()
+    window.show()
+    def close():
+        window.close() # Parks it
+        app.processEvents()
+    def reopen():
+        replies = []
+        request = threading.Thread(target=lambda: replies.append(hyprhide_ops.raise_picker(path=server.path)))
+        request.start()
+        loader = window.thumbnail_loader
+        deadline = time.monotonic() + 5
+        while not (replies and all(loader.pixmap(window.model.record(row)) is not None
+                                   for row in range(window.model.rowCount())
+                                   if window.model.record(row).address in set(loader.visible_addresses()))):
+            if time.monotonic() > deadline:
+                raise RuntimeError("gui-reopen: no reply or thumbnails not painted after 5 s")
+            app.processEvents()
+        request.join()
+        if replies != [True] or window.parked:
+            raise RuntimeError("gui-reopen: the picker did not reopen")
+    bench.measure(f"gui-reopen ({count})", reopen, setup=close)
+    server.server.close()
+    window.resident = False
+    window.hide()
+    window.restore_worker.stop()
+    window.deleteLater()
+    fake.clients.pop()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark hyprhide against a fake compositor")
+    parser.add_argument("--clients", type=int, default=50, help="Synthetic clients on the fake compositor")
+    parser.add_argument("--latency", type=float, default=1.0, help="Added latency per request, in ms")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--transport", choices=["socket", "hyprctl"], default="socket")
+    parser.add_argument("--ops", default="hide,bulk,min,gui", help="Comma separated: hide,bulk,min,gui")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--trace", type=str, metavar="OUT_JSON", help="Write a Chrome trace of the whole run")
+    args = parser.parse_args(argv)
+    if args.trace:
+        hyprhide_trace.enable(args.trace)
+
+    clients = [hyprland_fake.make_client(f"0x{i + 1:x}000", f"Window {i}", f"app{i % 7}",
+                                         at=(20 * (i % 40), 15 * (i % 40)), workspace=1 + i % 3)
+               for i in range(args.clients)]
+    fake = hyprland_fake.FakeHyprland(clients=clients, latency=args.latency / 1000).start()
+    env = dict(os.environ, **fake.env())
+    if args.transport == "hyprctl":
+        bin_dir = tempfile.mkdtemp(prefix="hyprhide-bench-bin-")
+        hyprctl = os.path.join(bin_dir, "hyprctl")
+        with open(hyprctl, "w") as f:
+            f.write(FAKE_HYPRCTL)
+        os.chmod(hyprctl, 0o755)
+        os.environ["HYPRHIDE_FAKE_SOCKET"] = fake.socket_path
+        hyprland_interface.set_transport(hyprland_ipc.HyprctlTransport(hyprctl))
+        env = dict(os.environ, PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""))
+    else:
+        os.environ.update(fake.env())
+        hyprland_interface.set_transport(fake.transport())
+
+    bench = Bench(fake, args.runs)
+    ops = args.ops.split(",")
+    try:
+        if "hide" in ops:
+            bench_hide_restore(bench, fake)
+        if "bulk" in ops:
+            bench_bulk(bench, fake)
+        if "min" in ops:
+            bench_min_cli(bench, fake, env)
+        if "gui" in ops:
+            bench_gui_open(bench, fake)
+    finally:
+        fake.stop()
+
+    if args.json:
+        print(json.dumps({"clients": args.clients, "latency_ms": args.latency, "transport": args.transport,
+                          "results": bench.results}, indent=2))
+    else:
+        print(f"{args.clients} clients, {args.latency:g} ms latency, {args.transport} transport")
+        bench.report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,175 @@
+# Index of hidden windows.
+#
+# One SQLite database (HIDE_DIR/index.db) holds the few fields hide and restore
+# actually use, instead of one <address>.json file with the full hyprctl blob per
+# window. Every write is its own transaction, so a crash mid-hide can't leave a
+# half written record. Thumbnails stay next to it as separate image files.
+#
+# Records come back as window_record.WindowRecord, the same type live clients
+# are parsed to, so callers can treat saved and live windows alike.
+import json
+import os
+import threading
+import time
+import hyprhide_log
+from window_record import WindowRecord
+
+HIDE_DIR = os.path.expanduser("~/.local/share/hypr-hide") # Dir where the index and thumbnails go
+DB_NAME = "index.db"
+log = hyprhide_log.get_logger("store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hidden (
+    address   TEXT PRIMARY KEY,
+    title     TEXT NOT NULL DEFAULT '',
+    class     TEXT NOT NULL DEFAULT '',
+    x         INTEGER NOT NULL DEFAULT 0,
+    y         INTEGER NOT NULL DEFAULT 0,
+    width     INTEGER NOT NULL DEFAULT 0,
+    height    INTEGER NOT NULL DEFAULT 0,
+    workspace INTEGER NOT NULL DEFAULT 1,
+    floating  INTEGER NOT NULL DEFAULT 0,
+    hidden_at REAL NOT NULL,
+    thumbnail TEXT,
+    backend   TEXT NOT NULL DEFAULT 'offscreen'
+);
+"""
+
+_COLUMNS = "address, title, class, x, y, width, height, workspace, floating, hidden_at, thumbnail, backend"
+_INSERT = f"INSERT OR REPLACE INTO hidden ({_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)"
+DEFAULT_BACKEND = "offscreen" # Rows written before backends existed were all parked offscreen
+
+
+def _row_to_record(row):
+    address, title, app_class, x, y, width, height, workspace, floating, hidden_at, thumbnail, backend = row
+    return WindowRecord(address, title, app_class, x, y, width, height, workspace, bool(floating),
+                        hidden_at=hidden_at, thumbnail=thumbnail, backend=backend)
+
+
+def _record_to_row(client, thumbnail=None, hidden_at=None, backend=None):
+    return (
+        client.address, client.title, client.app_class, client.x, client.y, client.width, client.height,
+        client.workspace, int(client.floating), hidden_at or client.hidden_at or time.time(),
+        thumbnail or client.thumbnail, backend or client.backend or DEFAULT_BACKEND,
+    )
+
+
+class HideStore:
+    def __init__(self, hide_dir=HIDE_DIR):
+        self.hide_dir = hide_dir
+        os.makedirs(hide_dir, exist_ok=True)
+        self.path = os.path.join(hide_dir, DB_NAME)
+        # One connection per process, used from several threads (the daemon's event
+        # thread, the GUI's thumbnail and restore workers), so every statement
+        # runs under _lock and transactions can't interleave
+        self._lock = threading.Lock()
+        import sqlite3 # Here, not at the top: it's ~5 ms hyprhide-min only pays once it has a window to store
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._add_missing_columns()
+        self.migrate_legacy_files()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _add_missing_columns(self):
+        # Indexes created by older versions lack columns added since
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(hidden)")}
+        if "backend" not in columns:
+            with self._lock, self._conn:
+                self._conn.execute(f"ALTER TABLE hidden ADD COLUMN backend TEXT NOT NULL DEFAULT '{DEFAULT_BACKEND}'")
+
+    def thumbnail_path(self, record):
+        if not record or not record.thumbnail:
+            return None
+        return os.path.join(self.hide_dir, record.thumbnail)
+
+    # Writes
+
+    def put(self, client, thumbnail=None, hidden_at=None, backend=None):
+        # client is a WindowRecord, live or from this store; backend is how it was hidden
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT, _record_to_row(client, thumbnail, hidden_at, backend))
+
+    def put_many(self, clients, thumbnails=None, backend=None):
+        # One transaction for the lot; thumbnails maps address -> file name
+        thumbnails = thumbnails or {}
+        with self._lock, self._conn:
+            self._conn.executemany(_INSERT, [
+                _record_to_row(client, thumbnails.get(client.address), backend=backend) for client in clients])
+
+    def set_thumbnail(self, address, thumbnail):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE hidden SET thumbnail = ? WHERE address = ?", (thumbnail, address))
+
+    def remove(self, address):
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM hidden WHERE address = ?", (address,))
+        return cur.rowcount > 0
+
+    def remove_many(self, addresses):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM hidden WHERE address = ?", [(a,) for a in addresses])
+
+    # Reads
+
+    def _select(self, where="", params=()):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {_COLUMNS} FROM hidden {where} ORDER BY hidden_at", params).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def get(self, address):
+        records = self._select("WHERE address = ?", (address,))
+        return records[0] if records else None
+
+    def all(self):
+        return self._select()
+
+    def addresses(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT address FROM hidden")}
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM hidden").fetchone()[0]
+
+    def data_version(self):
+        # Changes whenever another connection commits, so long lived processes
+        # can tell if they need to re-read without touching the table
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # Migration from the one-file-per-window layout
+
+    def migrate_legacy_files(self):
+        try:
+            legacy = [f for f in os.listdir(self.hide_dir) if f.endswith(".json")]
+        except OSError:
+            return 0
+        migrated = 0
+        for file in legacy:
+            path = os.path.join(self.hide_dir, file)
+            try:
+                with open(path) as f:
+                    client = WindowRecord.from_hyprland(json.load(f)) # Legacy files hold the full hyprctl blob
+                address = client.address
+                thumbnail = f"{address}.png" if os.path.exists(os.path.join(self.hide_dir, f"{address}.png")) else None
+                self.put(client, thumbnail=thumbnail, hidden_at=os.path.getmtime(path))
+                os.remove(path)
+                migrated += 1
+            except (OSError, ValueError, KeyError) as e:
+                log.warning("Could not migrate %s: %s", file, e)
+        return migrated
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(hide_dir=HIDE_DIR):
+    # One connection per process and directory
+    with _stores_lock:
+        if hide_dir not in _stores:
+            _stores[hide_dir] = HideStore(hide_dir)
+        return _stores[hide_dir]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Command line front end for hiding and restoring sets of windows.
+#
+#   hyprhide hide    [--class C | --workspace N | --address A | --all]
+#   hyprhide restore  --class C | --workspace N | --address A | --all  [--dry-run]
+#   hyprhide waybar   stream the hidden window count for a Waybar custom module
+#
+# hide with no selector hides the active window, like hyprhide-min. Whatever the
+# selector matches is hidden or restored with a fixed handful of batched
+# requests (see hyprhide_ops.hide_many / restore_many), not one run per window.
+import argparse
+import sys
+import time
+import hide_store
+import hyprland_interface
+import hyprhide_config
+import hyprhide_ops
+import hyprhide_trace
+import hyprhide_waybar
+
+
+def add_selector(parser, required):
+    group = parser.add_mutually_exclusive_group(required=required)
+    group.add_argument("--class", dest="app_class", metavar="CLASS", help="Windows of this class (case insensitive)")
+    group.add_argument("--workspace", type=int, metavar="N", help="Windows on workspace N")
+    group.add_argument("--address", metavar="A", help="The window with this address")
+    group.add_argument("--all", action="store_true", help="Every window")
+
+
+def selector(args):
+    address = args.address
+    if address is not None and not address.startswith("0x"):
+        address = f"0x{address}"
+    return {"app_class": args.app_class, "workspace": args.workspace, "address": address}
+
+
+def cmd_hide(args, config):
+    backend = args.backend or config.backend
+    if not (args.all or args.app_class or args.workspace is not None or args.address):
+        return [hyprhide_ops.hide_active_window(use_thumbnails=config.thumbnails, full_capture=config.full_capture,
+                                                backend=backend)]
+    hidden = hide_store.get_store().addresses()
+    chosen = [c for c in hyprland_interface.get_clients()
+              if c.address not in hidden and c.mapped and hyprhide_ops.matches(c, **selector(args))]
+    return hyprhide_ops.hide_many(chosen, use_thumbnails=config.thumbnails, full_capture=config.full_capture,
+                                  backend=backend)
+
+
+def cmd_restore(args, config):
+    # The index holds tens of rows, so the same matches() as for live clients
+    # (class is case-insensitive) beats per-selector queries and indexes
+    chosen = [r for r in hide_store.get_store().all() if hyprhide_ops.matches(r, **selector(args))]
+    if args.dry_run:
+        return hyprhide_ops.restore_many(chosen, log=print, dry_run=True)
+    return hyprhide_ops.restore_many(chosen)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="hyprhide", description="Hide and restore Hyprland windows in bulk")
+    commands = parser.add_subparsers(dest="command", required=True)
+    hide_parser = commands.add_parser("hide", help="Hide matching windows (the active one if no selector)")
+    add_selector(hide_parser, required=False)
+    hide_parser.add_argument("--backend", choices=hyprhide_ops.BACKENDS, help="Override [HIDE] backend from the config")
+    hide_parser.set_defaults(run=cmd_hide)
+    restore_parser = commands.add_parser("restore", help="Restore matching hidden windows")
+    add_selector(restore_parser, required=True)
+    restore_parser.add_argument("--dry-run", action="store_true", help="Print the dispatches a restore would send")
+    restore_parser.set_defaults(run=cmd_restore)
+    waybar_parser = commands.add_parser("waybar", help="Print Waybar JSON now and whenever the hidden set changes")
+    waybar_parser.set_defaults(run=None)
+    parser.add_argument("--trace", type=str, metavar="OUT_JSON", help="Write a Chrome trace of this run on exit")
+    args = parser.parse_args(argv)
+    if args.trace:
+        hyprhide_trace.enable(args.trace)
+
+    config = hyprhide_config.get()
+    hyprhide_ops.apply_config(config)
+    if args.command == "waybar":
+        return hyprhide_waybar.run()
+    start = time.perf_counter()
+    done = [a for a in args.run(args, config) if a]
+    print(f"{args.command}: {len(done)} window(s) in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0 if done else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
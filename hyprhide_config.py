@@ -0,0 +1,123 @@
+# Configuration shared by every hyprhide program.
+#
+# config.cfg is looked up in SEARCH_PATHS order and the first one found is
+# used. Every known key has a type and a default in SCHEMA; a value that doesn't
+# parse (or isn't one of the allowed choices) is logged and replaced by the
+# default, so callers never see a raw string.
+#
+# get() caches the parsed Config against the file's path and mtime: calling it
+# before every operation costs one stat, and a resident process picks up an
+# edited file on its next call without restarting.
+#
+#   config = hyprhide_config.get()
+#   if config.thumbnails: ...
+#   hyprland_interface.set_wait_budget(config.latency_budget_ms / 1000)
+import configparser
+import os
+import hyprhide_log
+
+USER_PATH = os.path.expanduser("~/.config/hyprhide/config.cfg")
+SEARCH_PATHS = (USER_PATH, "/usr/share/hyprhide/config.cfg", "config.cfg")
+
+# (section, key, attribute, type, default, choices)
+SCHEMA = (
+    ("GUI", "thumbnails", "thumbnails", bool, False, None),
+    ("GUI", "full_capture", "full_capture", bool, False, None),
+    ("GUI", "jump_to_mouse", "jump_to_mouse", bool, False, None), # Move the picker to the mouse
+    ("GUI", "x_offset", "x_offset", int, -240, None), # Picker offset from the mouse
+    ("GUI", "y_offset", "y_offset", int, 160, None),
+    ("GUI", "thumbnail_cache_mb", "thumbnail_cache_mb", int, 32, None), # Decoded thumbnails kept in memory
+    ("TIMING", "latency_budget_ms", "latency_budget_ms", int, 500, None), # Longest wait for Hyprland to apply a change
+    ("LOG", "debug", "debug", bool, False, None),
+    ("HIDE", "backend", "backend", str, "offscreen", ("offscreen", "special")),
+    ("DEV", "devmode", "devmode", bool, True, None),
+    ("DEV", "hyprhide_src", "hyprhide_src", str, None, None), # Run this HyprHideGui.py instead of the installed one
+    ("INIT", "first", "first_run", bool, True, None),
+    ("WAYBAR", "enabled", "waybar", bool, False, None),
+)
+
+log = hyprhide_log.get_logger("config")
+_cache = {"key": None, "config": None}
+
+
+class Config:
+    # One attribute per SCHEMA entry, plus the path it came from (None if no file was found)
+    def __init__(self, parser=None, path=None):
+        parser = parser or configparser.ConfigParser()
+        self.path = path
+        for section, key, name, kind, default, choices in SCHEMA:
+            setattr(self, name, _read(parser, section, key, kind, default, choices))
+
+    def __repr__(self):
+        values = ", ".join(f"{entry[2]}={getattr(self, entry[2])!r}" for entry in SCHEMA)
+        return f"Config(path={self.path!r}, {values})"
+
+
+def _read(parser, section, key, kind, default, choices):
+    if not parser.has_option(section, key):
+        return default
+    raw = parser.get(section, key)
+    try:
+        if kind is bool:
+            value = parser.getboolean(section, key)
+        elif kind is int:
+            value = parser.getint(section, key)
+        else:
+            value = raw.strip()
+    except ValueError:
+        log.warning("[%s] %s = %r is not a valid %s, using %r", section, key, raw, kind.__name__, default)
+        return default
+    if choices is not None and value not in choices:
+        log.warning("[%s] %s = %r is not one of %s, using %r", section, key, raw, ", ".join(choices), default)
+        return default
+    return value
+
+
+def find(paths=SEARCH_PATHS):
+    # The config file in use and its mtime, or (None, None)
+    for path in paths:
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+    return None, None
+
+
+def get(paths=SEARCH_PATHS):
+    # The parsed config, re-read only when the file (or which file) changed
+    key = (paths,) + find(paths)
+    if key != _cache["key"]:
+        path = key[1]
+        parser = configparser.ConfigParser()
+        if path is None:
+            log.warning("Please create a config.cfg file, or install this properly ")
+        else:
+            try:
+                parser.read(path)
+            except configparser.Error as e:
+                log.warning("Could not parse %s: %s", path, e)
+                parser = configparser.ConfigParser()
+        _cache["key"], _cache["config"] = key, Config(parser, path)
+    return _cache["config"]
+
+
+def editable(path=USER_PATH):
+    # A raw parser of the user's file (empty if there is none) to change and save()
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    return parser
+
+
+def save(parser, path=USER_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        parser.write(f)
+    _cache["key"] = None # Same-second writes can keep the mtime on coarse filesystems
+
+
+def ensure_user_config(path=USER_PATH):
+    # Make sure the user's file exists, creating ~/.config/hyprhide as needed
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "a").close()
+    return path
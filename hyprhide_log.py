@@ -0,0 +1,137 @@
+# Logging for all hyprhide programs.
+#
+# Quiet by default: warnings and errors go to stderr, info and up is kept in
+# memory and appended to LOG_PATH in one write when the buffer fills, an error
+# is logged, or the process exits. Debug output (every request, every wait) is
+# only produced with HYPRHIDE_DEBUG=1 or [LOG] debug = True, in which case it
+# also goes to stderr. The file is rotated by size.
+#
+# This is deliberately not the logging package: importing logging.handlers
+# costs hyprhide-min 10-25 ms of its startup budget, and levels, a buffer and
+# rotation are all it needs.
+#
+#   log = hyprhide_log.get_logger("interface")
+#   log.debug("Running request: %s", message) # formatted only if debug is on
+import atexit
+import os
+import sys
+import threading
+import time
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+LOG_PATH = "/tmp/hypr-hide-debug.log"
+MAX_BYTES = 512 * 1024 # Rotate when the file would grow past this
+BACKUPS = 2 # hypr-hide-debug.log.1, .2
+CAPACITY = 200 # Buffered lines before a flush
+
+_settings = {"path": LOG_PATH, "max_bytes": MAX_BYTES, "backups": BACKUPS}
+_file_level = INFO
+_console_level = WARNING
+_buffer = []
+_buffer_lock = threading.Lock() # The daemon logs from its socket and event threads
+_write_lock = threading.Lock() # One rotation and append at a time
+_loggers = {}
+
+
+def _env_debug():
+    return os.environ.get("HYPRHIDE_DEBUG", "").lower() in ("1", "true", "yes", "on")
+
+
+def configure(debug=None, path=None, max_bytes=None, backups=None):
+    # debug=None leaves it to HYPRHIDE_DEBUG; the env var wins over a False from config
+    global _file_level, _console_level
+    debug = _env_debug() or bool(debug)
+    _file_level = DEBUG if debug else INFO
+    _console_level = DEBUG if debug else WARNING
+    if path:
+        _settings["path"] = os.path.expanduser(path)
+    if max_bytes:
+        _settings["max_bytes"] = max_bytes
+    if backups is not None:
+        _settings["backups"] = backups
+
+
+def debug_enabled():
+    return _file_level <= DEBUG
+
+
+class Logger:
+    def __init__(self, name):
+        self.name = name
+
+    def log(self, level, message, *args):
+        if level < _file_level and level < _console_level:
+            return # The common case for debug: nothing is formatted
+        if args:
+            message = message % args
+        now = time.time()
+        line = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))}.{int(now % 1 * 1000):03d} " \
+               f"{LEVEL_NAMES[level]} {self.name}: {message}\n"
+        if level >= _console_level:
+            sys.stderr.write(message + "\n")
+        if level >= _file_level:
+            with _buffer_lock:
+                _buffer.append(line)
+                full = len(_buffer) >= CAPACITY
+            if level >= ERROR or full:
+                flush()
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, *args)
+
+
+def get_logger(name):
+    if name not in _loggers:
+        _loggers[name] = Logger(name)
+    return _loggers[name]
+
+
+def _rotate(path, backups):
+    for i in range(backups, 0, -1):
+        source = path if i == 1 else f"{path}.{i - 1}"
+        if os.path.exists(source):
+            os.replace(source, f"{path}.{i}")
+
+
+def flush():
+    global _buffer
+    with _buffer_lock: # Swap, so a line appended meanwhile lands in the next flush, not nowhere
+        lines, _buffer = _buffer, []
+    if not lines:
+        return
+    data = "".join(lines)
+    path = _settings["path"]
+    with _write_lock:
+        _write(path, data)
+
+
+def _write(path, data):
+    try:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > _settings["max_bytes"]:
+            if _settings["backups"]:
+                _rotate(path, _settings["backups"])
+            else:
+                os.remove(path)
+        with open(path, "a") as f:
+            f.write(data)
+    except OSError as e:
+        sys.stderr.write(f"Could not write {path}: {e}\n")
+
+
+configure()
+atexit.register(flush)
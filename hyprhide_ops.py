@@ -0,0 +1,448 @@
+# Hiding and restoring a window.
+# Each compositor step is a single DispatchBatch, so a hide or restore costs a
+# couple of round trips instead of one request per dispatch. The hidden window's
+# original state lives in the hide_store index (+ a thumbnail, see thumbnails.py).
+#
+# Two ways to hide ([HIDE] backend in config.cfg):
+#   offscreen - float the window and push it OFFSCREEN_OFFSET pixels away on its
+#               own workspace; restore moves it back and re-tiles it if needed.
+#   special   - move it to the special:hyprhide workspace; restore moves it back.
+#               Hyprland keeps its floating state and geometry, so nothing has to
+#               be reconstructed, and hidden windows take no space on real workspaces.
+# Either way restore_planner works out which dispatches a restore actually needs.
+import os
+import hide_store
+import hyprland_interface
+import hyprhide_log
+import hyprhide_trace
+import restore_planner
+import thumbnails
+from hyprland_interface import DispatchBatch
+
+OFFSCREEN_OFFSET = 5000 # Hidden windows are pushed this far right/down
+SPECIAL_WORKSPACE = "special:hyprhide"
+BACKEND_OFFSCREEN = "offscreen"
+BACKEND_SPECIAL = "special"
+BACKENDS = (BACKEND_OFFSCREEN, BACKEND_SPECIAL)
+HIDE_DIR = hide_store.HIDE_DIR
+_log = hyprhide_log.get_logger("ops")
+
+
+def prepare_for_hide(client):
+    # Get the window into a state where it can be captured and moved:
+    # not fullscreen, floating and focused.
+    address = client.address
+    with DispatchBatch() as batch:
+        if client.fullscreen:
+            batch.focus_window(address)
+            batch.toggle_fullscreen()
+        if not client.floating:
+            batch.set_floating(address)
+        batch.focus_window(address)
+    hyprland_interface.wait_for_client(
+        address, lambda c: c.floating and not c.fullscreen,
+        label="window floating and windowed")
+
+
+def park_window(address):
+    with DispatchBatch() as batch:
+        batch.move_window_by(address, OFFSCREEN_OFFSET, OFFSCREEN_OFFSET)
+
+
+def is_parked(client, monitors):
+    # Whether a live window looks hidden by either backend: on special:hyprhide,
+    # or not overlapping any monitor. A coordinate threshold would also match
+    # windows on monitors laid out past OFFSCREEN_OFFSET.
+    if client.workspace_name == SPECIAL_WORKSPACE:
+        return True
+    if not monitors:
+        return False # No layout to judge by, don't guess
+    x, y, w, h = client.geometry
+    for m in monitors:
+        mx, my = m.x, m.y
+        mw, mh = m.width / m.scale, m.height / m.scale
+        if x < mx + mw and x + max(w, 1) > mx and y < my + mh and y + max(h, 1) > my:
+            return False
+    return True
+
+
+def restore_target(workspace):
+    # Windows recovered from special:hyprhide have no known home workspace
+    # (special workspaces have negative ids); bring those to the current one
+    return workspace if workspace > 0 else hyprland_interface.get_active_workspace_id()
+
+
+def _parked_state(record):
+    # Where hiding left the window. A single restore plans from this instead of
+    # querying first; the verification afterwards catches a window that moved.
+    if record.backend == BACKEND_SPECIAL:
+        # Special workspaces have negative ids, 0 never matches a restore target
+        return record.replace(workspace=0, workspace_name=SPECIAL_WORKSPACE)
+    return record.replace(floating=True, fullscreen=0,
+                          x=record.x + OFFSCREEN_OFFSET, y=record.y + OFFSCREEN_OFFSET)
+
+
+@hyprhide_trace.traced("restore")
+def restore_record(record, current=None, log=_log.info):
+    # Put a hidden window back with the dispatches its state needs (see
+    # restore_planner), in one batch verified once. current is the live client
+    # if the caller has it. Returns the live client.
+    address = record.address
+    workspace = restore_target(record.workspace)
+    def done(client):
+        return restore_planner.satisfied(client, record, workspace)
+    if current is None:
+        current = _parked_state(record)
+    restore_planner.plan(current, record, workspace).flush()
+    if not hyprland_interface.wait_for_client(address, done, label="window restored"):
+        # Not where we expected it to be: plan once more from what the last poll saw
+        live = hyprland_interface.get_client_info(address)
+        if live is None:
+            log(f"Window {address} not found.")
+            return None
+        log(f"Window {address} did not restore cleanly, correcting.")
+        with DispatchBatch() as batch:
+            restore_planner.add_steps(batch, live, record, workspace)
+        hyprland_interface.wait_for_client(address, done, label="window corrected")
+    return hyprland_interface.get_client_info(address)
+
+
+@hyprhide_trace.traced("capture")
+def capture_window(address, hide_dir, full_capture=False, log=_log.info):
+    # Re-fetch geometry, floating changes it. Returns the thumbnail file name or None.
+    target = hyprland_interface.get_client_info(address)
+    if not target:
+        log(f"Window {address} not found.")
+        return None
+    x, y, w, h = target.geometry
+    if not w or not h:
+        log("Missing geometry info.")
+        return None
+    log(f"Taking screenshot at geometry: {x},{y} {w}x{h}")
+    return thumbnails.capture(address, target.geometry, hide_dir, full_capture, log)
+
+
+@hyprhide_trace.traced("hide")
+def hide_window(client_info, use_thumbnails=False, hide_dir=HIDE_DIR, log=_log.info, full_capture=False,
+                backend=BACKEND_OFFSCREEN):
+    address = client_info.address
+    log(f"Window address: {address}")
+    log(f"Window info - Title: {client_info.title}, at={client_info.at} size={client_info.size} "
+        f"fullscreen={client_info.fullscreen} floating={client_info.floating}")
+    store = hide_store.get_store(hide_dir)
+    if store.get(address) is not None:
+        # Focus can stay on a parked window; hiding it again would overwrite
+        # its saved state with the parked one
+        log(f"Window {address} is already hidden.")
+        return None
+
+    if backend == BACKEND_SPECIAL:
+        # Geometry is untouched, so the thumbnail can use what we already have
+        thumbnail = thumbnails.capture(address, client_info.geometry, hide_dir, full_capture, log) if use_thumbnails else None
+        store.put(client_info, thumbnail=thumbnail, backend=backend)
+        with DispatchBatch() as batch:
+            batch.move_win_to_workspace(address, SPECIAL_WORKSPACE)
+        log(f"Moved window to {SPECIAL_WORKSPACE}.")
+        return address
+
+    # Un-fullscreen, float and focus the window in one batched request,
+    # then wait (at most the wait budget) for Hyprland to apply it
+    prepare_for_hide(client_info)
+
+    # Save window info as it was before we touched it
+    thumbnail = capture_window(address, hide_dir, full_capture, log) if use_thumbnails else None
+    store.put(client_info, thumbnail=thumbnail, backend=backend)
+
+    park_window(address)
+    log("Moved window offscreen.")
+    return address
+
+
+@hyprhide_trace.traced("hide")
+def hide_active_window(use_thumbnails=False, hide_dir=HIDE_DIR, log=_log.info, full_capture=False,
+                       backend=BACKEND_OFFSCREEN):
+    # activewindow already carries the full client info
+    client_info = hyprland_interface.get_active_client()
+    if not client_info:
+        log("No active window found.")
+        return None
+    return hide_window(client_info, use_thumbnails, hide_dir, log, full_capture, backend)
+
+
+def matches(record, app_class=None, workspace=None, address=None):
+    # Selector shared by bulk hide (live clients) and bulk restore (store records)
+    if address is not None and record.address != address:
+        return False
+    if app_class is not None and record.app_class.lower() != app_class.lower():
+        return False
+    if workspace is not None and record.workspace != workspace:
+        return False
+    return True
+
+
+@hyprhide_trace.traced("bulk-hide")
+def hide_many(clients, use_thumbnails=False, hide_dir=HIDE_DIR, log=_log.info, full_capture=False,
+              backend=BACKEND_OFFSCREEN):
+    # Hide a set of windows in three requests however many there are: one batch
+    # to float/unfullscreen them all, one clients poll (or a few) until that
+    # landed, one batch to park them. The special backend needs only the last.
+    # Returns the hidden addresses.
+    clients = list(clients)
+    if not clients:
+        return []
+    addresses = [c.address for c in clients]
+    if backend == BACKEND_SPECIAL:
+        thumbs = _capture_shown(clients, hide_dir, full_capture, log) if use_thumbnails else {}
+        hide_store.get_store(hide_dir).put_many(clients, thumbs, backend)
+        with DispatchBatch() as batch:
+            for address in addresses:
+                batch.move_win_to_workspace(address, SPECIAL_WORKSPACE)
+        log(f"Moved {len(addresses)} windows to {SPECIAL_WORKSPACE}.")
+        return addresses
+
+    with DispatchBatch() as batch:
+        for client in clients:
+            if client.fullscreen:
+                batch.focus_window(client.address) # fullscreen acts on the focused window
+                batch.toggle_fullscreen()
+            if not client.floating:
+                batch.set_floating(client.address)
+
+    snapshot = hyprland_interface.get_snapshot()
+    def all_prepared():
+        snapshot.invalidate()
+        for address in addresses:
+            client = snapshot.get(address)
+            if client is not None and (not client.floating or client.fullscreen):
+                return False
+        return True
+    hyprland_interface.wait_until(all_prepared, label=f"{len(addresses)} windows floating")
+
+    thumbs = {}
+    if use_thumbnails: # Capture with the floating geometry
+        thumbs = _capture_shown([c for c in map(snapshot.get, addresses) if c], hide_dir, full_capture, log)
+
+    # Saved state is as it was before we touched the windows
+    hide_store.get_store(hide_dir).put_many(clients, thumbs, backend)
+
+    with DispatchBatch() as batch:
+        for address in addresses:
+            batch.move_window_by(address, OFFSCREEN_OFFSET, OFFSCREEN_OFFSET)
+    log(f"Moved {len(addresses)} windows offscreen.")
+    return addresses
+
+
+def _capture_shown(clients, hide_dir, full_capture, log):
+    # Only windows on a workspace that is on screen can be captured
+    shown = {m.active_workspace for m in hyprland_interface.get_monitors()}
+    thumbs = {}
+    for client in clients:
+        if client.workspace in shown:
+            thumb = thumbnails.capture(client.address, client.geometry, hide_dir, full_capture, log)
+            if thumb:
+                thumbs[client.address] = thumb
+    return thumbs
+
+
+def plan_restore(records, clients):
+    # One batch restoring every record from its window's live state. Returns the
+    # batch, the planned records (workspace resolved) and the addresses whose
+    # window has since closed.
+    live = {c.address: c for c in clients}
+    gone = [r.address for r in records if r.address not in live]
+    records = [r for r in records if r.address in live]
+    if any(r.workspace <= 0 for r in records):
+        active = hyprland_interface.get_active_workspace_id()
+        records = [r if r.workspace > 0 else r.replace(workspace=active) for r in records]
+    batch = DispatchBatch()
+    for record in records:
+        restore_planner.add_steps(batch, live[record.address], record, record.workspace)
+    if len({r.workspace for r in records}) == 1:
+        # All from one workspace: go there, like a single restore does
+        batch.focus_window(records[-1].address)
+    return batch, records, gone
+
+
+@hyprhide_trace.traced("bulk-restore")
+def restore_many(records, hide_dir=HIDE_DIR, log=_log.info, dry_run=False):
+    # Restore a set of hidden windows with one batch and one verification poll.
+    # Records whose window has since closed are just dropped from the index.
+    # With dry_run the plan is logged and nothing is changed.
+    # Returns the restored (or, dry run, planned) addresses.
+    records = list(records)
+    if not records:
+        return []
+    batch, records, gone = plan_restore(records, hyprland_interface.get_clients())
+    for address in gone:
+        log(f"Window {address} no longer exists, forgetting it.")
+    if dry_run:
+        for command in batch.commands:
+            log(command)
+        return [r.address for r in records]
+
+    batch.flush()
+    if records:
+        snapshot = hyprland_interface.get_snapshot()
+        def all_restored():
+            snapshot.invalidate()
+            for record in records:
+                client = snapshot.get(record.address)
+                if client is not None and not restore_planner.satisfied(client, record, record.workspace):
+                    return False
+            return True
+        hyprland_interface.wait_until(all_restored, label=f"{len(records)} windows restored")
+
+    restored = [r.address for r in records]
+    hide_store.get_store(hide_dir).remove_many(restored + gone)
+    for address in restored + gone:
+        thumbnails.remove(address, hide_dir)
+    return restored
+
+
+@hyprhide_trace.traced("reconcile")
+def reconcile(clients, hide_dir=HIDE_DIR, log=_log.info):
+    # Bring the index in line with what Hyprland actually has, from one client
+    # snapshot and one directory listing:
+    #   stale   - recorded as hidden but the window is gone
+    #   missing - parked (offscreen or on special:hyprhide) but not recorded,
+    #             e.g. hide crashed midway
+    #   orphans - thumbnail files no record points to
+    store = hide_store.get_store(hide_dir)
+    hidden = store.addresses()
+    live = {c.address: c for c in clients}
+    unrecorded = [c for a, c in live.items() if a not in hidden]
+    monitors = hyprland_interface.get_monitor_layout()
+    missing = {c.address for c in unrecorded if is_parked(c, monitors)}
+    if missing:
+        # The cached layout may predate a monitor change; only recover on a current one
+        monitors = hyprland_interface.get_monitor_layout(refresh=True)
+        missing = {c.address for c in unrecorded if is_parked(c, monitors)}
+    stale = hidden - live.keys()
+
+    if stale:
+        store.remove_many(stale)
+    if missing:
+        recovered = []
+        for address in missing:
+            client = live[address]
+            if client.workspace_name == SPECIAL_WORKSPACE:
+                recovered.append(client.replace(backend=BACKEND_SPECIAL))
+                continue
+            # Undo the park offset so a restore lands it back on screen
+            x = client.x - OFFSCREEN_OFFSET if client.x >= OFFSCREEN_OFFSET else client.x
+            y = client.y - OFFSCREEN_OFFSET if client.y >= OFFSCREEN_OFFSET else client.y
+            recovered.append(client.replace(x=x, y=y, backend=BACKEND_OFFSCREEN))
+        store.put_many(recovered)
+
+    keep = (hidden - stale) | missing
+    orphans = 0
+    for name in os.listdir(hide_dir):
+        if name.endswith((".ppm", ".png")) and name.split(".", 1)[0] not in keep:
+            try:
+                os.remove(os.path.join(hide_dir, name))
+                orphans += 1
+            except OSError as e:
+                log(f"Failed to remove {name}: {e}")
+
+    if stale or missing or orphans:
+        log(f"[Reconcile] dropped {len(stale)} stale, recovered {len(missing)} parked, removed {orphans} orphan files")
+    return {"stale": stale, "missing": missing, "orphans": orphans}
+
+
+PICKER_SIZE = (460, 500) # HyprHideApp's fixed size
+PICKER_SOCKET_NAME = "hyprhide-gui.sock" # A resident picker takes "show [x y]" here
+PICKER_WORKSPACE = "special:hyprhide-picker" # Where a closed resident picker waits
+
+
+def picker_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    return os.path.join(runtime_dir, PICKER_SOCKET_NAME)
+
+
+def raise_picker(position=None, path=None):
+    # Ask a resident picker to reopen, at position or where its config says.
+    # False if none is running, in which case the caller launches one.
+    import socket
+    message = "show" if position is None else f"show {position[0]} {position[1]}"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(2.0)
+            sock.connect(path or picker_socket_path())
+            sock.sendall((message + "\n").encode())
+            return sock.makefile("r").readline().strip() == "ok"
+    except OSError:
+        return False
+
+
+def _picker_offset(config):
+    # The configured offsets from the cursor; the picker has a fixed size, so plain pixels
+    return config.x_offset - 240, PICKER_SIZE[1] // 4 + config.y_offset
+
+
+def picker_rules(config, position=None):
+    # One-shot exec rules that map the picker in place: at position (x, y) if
+    # given, else next to the mouse if jump_to_mouse is on; None to let it map
+    # wherever Hyprland puts it
+    if position is not None:
+        return ["float", f"move {position[0]} {position[1]}"]
+    if not config.jump_to_mouse:
+        return None
+    # Hyprland finds the cursor and, with onscreen, keeps the picker inside that monitor
+    dx, dy = _picker_offset(config)
+    return ["float", f"move onscreen cursor {dx} {dy}"]
+
+
+def picker_position(config, cursor, monitors):
+    # Where picker_rules would put a new picker, for a resident one being
+    # reopened (exec rules only apply to a window as it maps): the offsets from
+    # cursor, kept inside the monitor under it
+    dx, dy = _picker_offset(config)
+    x, y = cursor[0] + dx, cursor[1] + dy
+    width, height = PICKER_SIZE
+    for m in monitors:
+        mw, mh = m.width / m.scale, m.height / m.scale
+        if m.x <= cursor[0] < m.x + mw and m.y <= cursor[1] < m.y + mh:
+            return int(max(m.x, min(x, m.x + mw - width))), int(max(m.y, min(y, m.y + mh - height)))
+    return x, y
+
+
+def launch_picker(args, rules=None):
+    # Start the picker (argv list). With rules (see picker_rules), Hyprland
+    # launches it and applies them to its window only, so it maps in place and
+    # no rule outlives it.
+    import subprocess # Deferred, like in thumbnails: min.py never launches anything
+    if rules:
+        import shlex
+        reply = hyprland_interface.exec_with_rules(shlex.join(args), rules)
+        if reply.strip() == "ok":
+            return
+        _log.warning("Hyprland could not launch the picker (%s), starting it unplaced", reply.strip() or "no reply")
+    subprocess.Popen(args, start_new_session=True)
+
+
+def apply_config(config):
+    # The hyprhide_config settings that live in other modules
+    hyprhide_log.configure(debug=config.debug)
+    hyprland_interface.set_wait_budget(config.latency_budget_ms / 1000)
+
+
+def load_hidden(hide_dir=HIDE_DIR):
+    return {record.address: record for record in hide_store.get_store(hide_dir).all()}
+
+
+def forget_hidden(address, hide_dir=HIDE_DIR):
+    hide_store.get_store(hide_dir).remove(address)
+    thumbnails.remove(address, hide_dir)
+
+
+def restore_confirmed(record, client):
+    # Whether client (as restore_record returned it) is where record says it belongs
+    return client is not None and restore_planner.satisfied(client, record, restore_target(record.workspace))
+
+
+def restore_hidden(data, hide_dir=HIDE_DIR):
+    # data is a hide_store record
+    address = data.address
+    client_data = restore_record(data)
+    forget_hidden(address, hide_dir)
+    return client_data
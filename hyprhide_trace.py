@@ -0,0 +1,159 @@
+# Timing for Hyprland requests, waits and GUI phases.
+#
+# Every request through hyprland_interface is timed and counted under the
+# operation that issued it (the innermost operation() block, e.g. "restore"),
+# with a latency histogram per request kind. That is always on and costs two
+# clock reads per request. When enabled with a path (--trace out.json), spans
+# are also kept and written at exit in Chrome trace-event format, which
+# chrome://tracing, Perfetto or speedscope can open.
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000) # Histogram upper edges
+
+_t0 = time.perf_counter()
+_local = threading.local()
+_lock = threading.Lock()
+_events = []
+_trace_path = None
+counters = {} # (operation, kind) -> [calls, total seconds]
+histograms = {} # kind -> list of len(BUCKETS_MS) + 1 counts
+
+
+def enable(path):
+    # Keep spans and write them to path when the process exits
+    global _trace_path
+    if _trace_path is None:
+        atexit.register(write)
+    _trace_path = path
+
+
+def enabled():
+    return _trace_path is not None
+
+
+def current_operation():
+    stack = getattr(_local, "ops", None)
+    return stack[-1] if stack else "-"
+
+
+def record_span(name, cat, start, end, args=None):
+    if _trace_path is None:
+        return
+    event = {"name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+             "ts": (start - _t0) * 1e6, "dur": (end - start) * 1e6}
+    if args:
+        event["args"] = args
+    with _lock:
+        _events.append(event)
+
+
+class span:
+    # with span("decode thumbnail", "thumbnail", address=...): ...
+    def __init__(self, name, cat="app", **args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.end = time.perf_counter()
+        record_span(self.name, self.cat, self.start, self.end, self.args)
+
+    @property
+    def seconds(self):
+        return self.end - self.start
+
+
+class operation(span):
+    # Tags every request made inside the block with name
+    def __init__(self, name, **args):
+        super().__init__(name, "operation", **args)
+
+    def __enter__(self):
+        if not hasattr(_local, "ops"):
+            _local.ops = []
+        _local.ops.append(self.name)
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        _local.ops.pop()
+        super().__exit__(*exc)
+
+
+def traced(name):
+    # Decorator form of operation()
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def request_kind(message):
+    if message.startswith("[[BATCH]]"):
+        return "batch"
+    if message.startswith("j/"):
+        return "query"
+    if message.startswith("dispatch "):
+        return "dispatch"
+    return "other"
+
+
+def record_request(message, start, end, ok=True):
+    kind = request_kind(message)
+    op = current_operation()
+    elapsed = end - start
+    ms = elapsed * 1000
+    bucket = next((i for i, edge in enumerate(BUCKETS_MS) if ms <= edge), len(BUCKETS_MS))
+    with _lock:
+        entry = counters.setdefault((op, kind), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        histograms.setdefault(kind, [0] * (len(BUCKETS_MS) + 1))[bucket] += 1
+    name = message.split(";", 1)[0][:80] # First command is enough to tell requests apart
+    record_span(name, "ipc." + kind, start, end, {"operation": op, "ok": ok, "message": message[:500]})
+
+
+def reset():
+    with _lock:
+        counters.clear()
+        histograms.clear()
+        _events.clear()
+
+
+def summary():
+    with _lock:
+        return {
+            "requests": [{"operation": op, "kind": kind, "calls": calls, "total_ms": round(total * 1000, 3)}
+                         for (op, kind), (calls, total) in sorted(counters.items())],
+            "histograms_ms": {kind: dict(zip([*map(str, BUCKETS_MS), "inf"], counts))
+                              for kind, counts in histograms.items()},
+        }
+
+
+def print_summary(out=None):
+    out = out or sys.stderr
+    for row in summary()["requests"]:
+        print(f"{row['operation']:>14} {row['kind']:<8} {row['calls']:>5} calls {row['total_ms']:9.2f} ms", file=out)
+
+
+def write(path=None):
+    path = path or _trace_path
+    if not path:
+        return
+    with _lock:
+        events = list(_events)
+    metadata = {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": os.path.basename(sys.argv[0])}}
+    with open(path, "w") as f:
+        json.dump({"traceEvents": [metadata, *events], "displayTimeUnit": "ms", "otherData": summary()}, f)
@@ -0,0 +1,111 @@
+# Waybar custom module: `hyprhide waybar` prints one JSON line with the hidden
+# window count and list, then a new line each time the hidden set changes.
+#
+# Changes are picked up with inotify on the hide store's directory: every
+# hide, restore or cleanup commits to index.db, which touches it (or its
+# journal). Between commits the process sits in a blocking read, so an idle
+# bar costs no wakeups and no spawned processes. inotify is reached through
+# ctypes to avoid a dependency.
+#
+#   "custom/hyprhide": {"exec": "hyprhide waybar", "return-type": "json", "on-click": "hyprhidectl show-gui"}
+import ctypes
+import json
+import os
+import struct
+import sys
+import time
+import hide_store
+import hyprhide_log
+
+ICON = "🗔"
+POLL_INTERVAL = 2.0 # Only used when inotify isn't available
+
+# From <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII") # wd, mask, cookie, len, then len bytes of name
+
+log = hyprhide_log.get_logger("waybar")
+
+
+class Inotify:
+    def __init__(self):
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def read(self):
+        # Blocks until something happens; returns the file names of every queued event
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            names.append(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _escape(text):
+    # Waybar renders text and tooltip as Pango markup
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def status(records):
+    records = sorted(records, key=lambda r: r.hidden_at or 0)
+    if not records:
+        return {"text": ICON, "tooltip": "No hidden windows", "class": "empty"}
+    lines = [f"{len(records)} hidden window{'s' if len(records) != 1 else ''}"]
+    lines += [_escape(f"{r.app_class}: {r.title}" if r.app_class else r.title or r.address) for r in records]
+    return {"text": f"{ICON} {len(records)}", "tooltip": "\n".join(lines), "class": "hidden"}
+
+
+def run(hide_dir=hide_store.HIDE_DIR, out=None):
+    out = out or sys.stdout
+    store = hide_store.get_store(hide_dir)
+    last = None
+
+    def emit():
+        nonlocal last
+        line = json.dumps(status(store.all()), ensure_ascii=False)
+        if line != last: # Waybar only hears about actual changes
+            out.write(line + "\n")
+            out.flush()
+            last = line
+
+    try:
+        watch = Inotify()
+        watch.add_watch(hide_dir)
+    except (OSError, AttributeError) as e: # AttributeError: no inotify in this libc
+        log.warning("inotify unavailable (%s), polling every %.0f s", e, POLL_INTERVAL)
+        watch = None
+
+    try:
+        emit()
+        if watch is None:
+            version = store.data_version()
+            while True:
+                time.sleep(POLL_INTERVAL)
+                if store.data_version() != version:
+                    version = store.data_version()
+                    emit()
+        while True:
+            # One read drains a whole burst, so a bulk hide is one re-read
+            if any(name.startswith(hide_store.DB_NAME) for name in watch.read()):
+                emit()
+    except (BrokenPipeError, KeyboardInterrupt): # Waybar went away, or Ctrl+C
+        return 0
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# Minimal client for hyprhided. Imports only what it needs so it starts fast
+# (run it with python3 -S to skip site-packages too).
+#
+#   hyprhidectl hide | restore [address] | list | show-gui [x y] | stats | ping
+#
+# show-gui goes straight to a resident picker when one is running (see
+# hyprhide_ops.raise_picker), so reopening it doesn't need the daemon.
+#
+# Exit codes: 0 ok, 1 the daemon reported an error, 3 the daemon is not running.
+import os
+import socket
+import sys
+
+EXIT_NO_DAEMON = 3
+
+
+def request(path, line):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall((line + "\n").encode())
+        return sock.makefile("r").readline()
+
+
+def main(argv):
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    if argv[0] == "show-gui":
+        try:
+            if request(os.path.join(runtime_dir, "hyprhide-gui.sock"), " ".join(["show"] + argv[1:])).strip() == "ok":
+                sys.stdout.write('{"ok": true, "reopened": true}\n')
+                return 0
+        except OSError:
+            pass # No resident picker; the daemon launches one
+    try:
+        reply = request(os.path.join(runtime_dir, "hyprhide.sock"), " ".join(argv))
+    except OSError:
+        return EXIT_NO_DAEMON
+    sys.stdout.write(reply)
+    return 0 if '"ok": true' in reply else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or ["ping"]))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# Resident HyprHide daemon.
+#
+# Keeps the Hyprland connection, the config and the hidden-window index in
+# memory and serves one command per connection on a Unix socket:
+#
+#   hide [address]   hide the active (or given) window
+#   restore [address] restore a hidden window (the most recently hidden one by default)
+#   list             hidden windows as JSON
+#   show-gui [x y]   reopen the resident picker, or launch it (at x,y if given)
+#   stats            request counts and latency histograms since start
+#   ping
+#
+# Replies are a single JSON line: {"ok": true, ...} or {"ok": false, "error": "..."}.
+# hyprhidectl.py is the matching client; start this with exec-once in hyprland.conf.
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+import traceback
+import hide_store
+import hyprland_events
+import hyprland_interface
+import hyprland_ipc
+import hyprhide_config
+import hyprhide_log
+import hyprhide_ops
+import hyprhide_trace
+
+log = hyprhide_log.get_logger("daemon")
+CLIENT_TIMEOUT = 2.0 # Seconds a client gets to send its command, so a stuck one can't block the rest
+
+
+def daemon_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    return os.path.join(runtime_dir, "hyprhide.sock")
+
+
+class HyprHideDaemon:
+    def __init__(self, path=None, hide_dir=hyprhide_ops.HIDE_DIR, config_paths=hyprhide_config.SEARCH_PATHS):
+        self.path = path or daemon_socket_path()
+        self.hide_dir = hide_dir
+        self.config_paths = config_paths
+        self.config = None
+        self.hidden = {}
+        self.store = None
+        self._data_version = None
+        self.listener = None
+        self._server = None
+        self._lock = threading.Lock() # Commands and event callbacks both touch self.hidden
+
+    def load(self):
+        self.reload_config()
+        self.store = hide_store.get_store(self.hide_dir)
+        self.hidden = hyprhide_ops.load_hidden(self.hide_dir)
+        self._data_version = self.store.data_version()
+
+    def reload_config(self):
+        # hyprhide_config only re-reads the file when its mtime moved, so this is
+        # one stat per command and edits apply without a restart
+        config = hyprhide_config.get(self.config_paths)
+        if config is not self.config:
+            if self.config is not None:
+                log.info("Reloaded %s", config.path)
+            self.config = config
+            hyprhide_ops.apply_config(config)
+
+    def sync(self):
+        # The GUI and min.py also write to the index; data_version only moves when
+        # another process committed, so this is one cheap pragma per command
+        version = self.store.data_version()
+        if version != self._data_version:
+            self.hidden = hyprhide_ops.load_hidden(self.hide_dir)
+            self._data_version = version
+
+    def start_listener(self):
+        # Windows closed while hidden are dropped from the index as soon as Hyprland says so
+        try:
+            self.listener = hyprland_events.EventListener().start()
+        except hyprland_ipc.HyprlandIPCError as e:
+            log.warning("Event stream unavailable: %s", e)
+            return
+        self.listener.on_event(self._on_event)
+        hyprland_interface.set_event_listener(self.listener) # Hide/restore waits wake on events
+        hyprland_interface.get_monitor_layout(refresh=True) # From here on monitor events keep it current
+
+    def _on_event(self, event, data):
+        try:
+            self._apply_event(event, data)
+        except Exception: # The listener thread must keep running
+            log.error("Handling %s>>%s failed:\n%s", event, data, traceback.format_exc())
+
+    def _apply_event(self, event, data):
+        if event in ("monitoradded", "monitoraddedv2", "monitorremoved", "configreloaded"):
+            # Keep the layout the picker places itself with current
+            with self._lock:
+                hyprland_interface.get_monitor_layout(refresh=True)
+        elif event == "closewindow":
+            address = hyprland_events.normalize_address(data)
+            with self._lock:
+                if self.hidden.pop(address, None) is not None:
+                    hyprhide_ops.forget_hidden(address, self.hide_dir)
+
+    # Commands
+
+    def cmd_hide(self, address=None):
+        client_info = hyprland_interface.get_client_info(address) if address else hyprland_interface.get_active_client()
+        if client_info is None:
+            return {"ok": False, "error": f"no window {address}" if address else "no active window"}
+        if client_info.address in self.hidden:
+            return {"ok": False, "error": f"{client_info.address} is already hidden"}
+        hidden = hyprhide_ops.hide_window(client_info, self.config.thumbnails, self.hide_dir,
+                                          full_capture=self.config.full_capture, backend=self.config.backend)
+        if hidden is None:
+            return {"ok": False, "error": f"could not hide {client_info.address}"}
+        self.hidden[hidden] = self.store.get(hidden)
+        return {"ok": True, "address": hidden}
+
+    def cmd_restore(self, address=None):
+        if address is None:
+            if not self.hidden:
+                return {"ok": False, "error": "nothing is hidden"}
+            address = max(self.hidden.values(), key=lambda r: r.hidden_at or 0).address
+        data = self.hidden.get(address)
+        if data is None:
+            return {"ok": False, "error": f"{address} is not hidden"}
+        client = hyprhide_ops.restore_hidden(data, self.hide_dir)
+        del self.hidden[address] # Only once restore_hidden returned, so a failure leaves it listed
+        if client is None:
+            return {"ok": False, "error": f"{address} no longer exists", "address": address}
+        if not hyprhide_ops.restore_confirmed(data, client):
+            return {"ok": False, "error": f"restore of {address} was not confirmed by Hyprland", "address": address}
+        return {"ok": True, "address": address}
+
+    def cmd_list(self):
+        return {"ok": True, "windows": [
+            {"address": d.address, "title": d.title, "class": d.app_class, "workspace": d.workspace}
+            for d in self.hidden.values()
+        ]}
+
+    def cmd_show_gui(self, x=None, y=None):
+        position = (int(x), int(y)) if x is not None and y is not None else None
+        if hyprhide_ops.raise_picker(position): # A resident picker reopens with its thumbnails decoded
+            return {"ok": True, "reopened": True}
+        version = _read_version()
+        run_file = self.config.hyprhide_src
+        if self.config.devmode and run_file:
+            args = ["python", os.path.abspath(os.path.expanduser(run_file)), "--launched", "--set-version", f"{version}-DEV"]
+        else:
+            args = ["hyprhide-gui-main", "--launched", "--set-version", version]
+        try:
+            hyprhide_ops.launch_picker(args, hyprhide_ops.picker_rules(self.config, position))
+        except OSError as e:
+            return {"ok": False, "error": f"could not start the picker: {e}"}
+        return {"ok": True}
+
+    def cmd_stats(self):
+        return {"ok": True, **hyprhide_trace.summary()}
+
+    def cmd_ping(self):
+        return {"ok": True, "hidden": len(self.hidden)}
+
+    def handle(self, line):
+        name, *args = line.split() or [""]
+        handler = getattr(self, "cmd_" + name.replace("-", "_"), None) if name else None
+        if handler is None:
+            return {"ok": False, "error": f"unknown command {name!r}"}
+        with self._lock:
+            try:
+                self.reload_config()
+                self.sync()
+                return handler(*args)
+            except (TypeError, ValueError) as e: # Wrong number or kind of arguments
+                return {"ok": False, "error": str(e)}
+            except Exception as e: # A failing command must not take the daemon down
+                log.error("%r failed:\n%s", line, traceback.format_exc())
+                return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    # Socket loop
+
+    def serve_forever(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self._server.listen(8)
+        log.info("hyprhided listening on %s", self.path)
+        while self._server is not None:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+            with conn:
+                conn.settimeout(CLIENT_TIMEOUT)
+                try:
+                    line = conn.makefile("r").readline().strip()
+                    reply = self.handle(line)
+                    conn.sendall((json.dumps(reply) + "\n").encode())
+                except OSError as e:
+                    log.warning("Client error: %s", e)
+
+    def shutdown(self, *_):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self.listener is not None:
+            hyprland_interface.set_event_listener(None)
+            self.listener.stop()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _read_version():
+    try:
+        with open('/usr/share/hyprhide/version.txt') as f:
+            return f.read().strip()
+    except OSError:
+        return "dev"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HyprHide daemon")
+    parser.add_argument("--socket", type=str, help="Path of the command socket")
+    parser.add_argument("--trace", type=str, metavar="OUT_JSON", help="Write a Chrome trace when the daemon exits")
+    args = parser.parse_args()
+    if args.trace:
+        hyprhide_trace.enable(args.trace)
+
+    daemon = HyprHideDaemon(path=args.socket)
+    daemon.load()
+    daemon.start_listener()
+    signal.signal(signal.SIGTERM, lambda *_: (daemon.shutdown(), exit(0)))
+    signal.signal(signal.SIGINT, lambda *_: (daemon.shutdown(), exit(0)))
+    signal.signal(signal.SIGHUP, lambda *_: daemon.load())
+    daemon.serve_forever()
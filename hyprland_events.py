@@ -0,0 +1,105 @@
+# Hyprland's event socket (.socket2.sock).
+#
+# The compositor pushes one "event>>data" line per change. EventListener
+# reads them on a background thread, hands each to the registered callbacks
+# and counts them, so a caller waiting for a change can wake as soon as
+# Hyprland reports one instead of sleeping a fixed time:
+#
+#   listener = EventListener().start()
+#   seen = listener.events_seen
+#   hyprhide_ops.park_window(address)
+#   listener.wait_for_event(seen, 1.0)
+#
+# Window state itself is read from the clients query: events carry no
+# geometry (moves and resizes send none), so a model folded from them
+# can't say where a window is.
+import socket
+import threading
+import time
+import hyprland_ipc
+
+
+def normalize_address(raw):
+    # Events carry addresses without the 0x prefix hyprctl uses
+    raw = raw.strip()
+    return raw if raw.startswith("0x") else f"0x{raw}"
+
+
+class EventListener:
+    def __init__(self, path=None):
+        self.path = path or hyprland_ipc.socket_path(hyprland_ipc.EVENT_SOCKET_NAME)
+        self.events_seen = 0
+        self._condition = threading.Condition()
+        self._sock = None
+        self._thread = None
+        self._callbacks = []
+
+    def start(self):
+        if not self.path:
+            raise hyprland_ipc.HyprlandIPCError("HYPRLAND_INSTANCE_SIGNATURE is not set")
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(self.path)
+        except OSError as e:
+            self._sock.close()
+            self._sock = None
+            raise hyprland_ipc.HyprlandIPCError(f"{self.path}: {e}") from e
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def on_event(self, callback):
+        # callback(event, data) runs on the listener thread
+        self._callbacks.append(callback)
+
+    def _read_loop(self):
+        buffer = b""
+        while self._sock is not None:
+            try:
+                chunk = self._sock.recv(4096)
+            except OSError:
+                break
+            if not chunk:
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            events = []
+            with self._condition:
+                for line in lines:
+                    event, sep, data = line.decode(errors="replace").partition(">>")
+                    if sep:
+                        self.events_seen += 1
+                        events.append((event, data))
+                self._condition.notify_all()
+            # Outside the condition: callbacks take their owner's locks, and the
+            # owner may be inside wait_for_event holding them
+            for event, data in events:
+                for callback in self._callbacks:
+                    callback(event, data)
+        with self._condition:
+            self._condition.notify_all()
+
+    def wait_for_event(self, seen, timeout):
+        # Block until more than seen events (see events_seen) have arrived or
+        # timeout seconds pass. Returns whether one did.
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self.events_seen == seen:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.running:
+                    return False
+                self._condition.wait(remaining)
+            return True
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# A tiny stand-in for the Hyprland request socket.
+#
+# It speaks the same protocol as .socket.sock and keeps just enough window
+# state (clients, active window, active workspace, monitors) for hyprhide's
+# hide and restore sequences to be exercised without a compositor. Changes are
+# also broadcast on a fake .socket2.sock, like the real event stream:
+#
+#   fake = FakeHyprland(clients=[make_client("0x1", "Firefox", "firefox")])
+#   fake.start()
+#   hyprland_interface.set_transport(fake.transport())
+#   ...
+#   fake.stop()
+import argparse
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import hyprland_ipc
+
+
+def make_client(address, title="Untitled", app_class="app", at=(0, 0), size=(800, 600),
+                workspace=1, floating=False, fullscreen=0, pid=0):
+    return {
+        "address": address,
+        "mapped": True,
+        "hidden": False,
+        "at": list(at),
+        "size": list(size),
+        "workspace": {"id": workspace, "name": str(workspace)},
+        "floating": floating,
+        "monitor": 0,
+        "class": app_class,
+        "title": title,
+        "initialClass": app_class,
+        "initialTitle": title,
+        "pid": pid,
+        "xwayland": False,
+        "pinned": False,
+        "fullscreen": fullscreen,
+        "focusHistoryID": 0,
+    }
+
+
+def make_monitor(monitor_id=0, name="FAKE-1", x=0, y=0, width=1920, height=1080, focused=True):
+    return {
+        "id": monitor_id,
+        "name": name,
+        "x": x,
+        "y": y,
+        "width": width,
+        "height": height,
+        "scale": 1.0,
+        "focused": focused,
+        "activeWorkspace": {"id": 1, "name": "1"},
+    }
+
+
+class FakeHyprland:
+    def __init__(self, clients=None, monitors=None, latency=0.0, signature="hyprhide-fake"):
+        self.clients = [dict(c) for c in (clients or [])]
+        self.monitors = monitors or [make_monitor()]
+        self.latency = latency # Seconds added to every request, to mimic a loaded compositor
+        self.signature = signature
+        self.active_address = self.clients[0]["address"] if self.clients else None
+        self.active_workspace = 1
+        self.cursor = (0, 0)
+        self.request_count = 0
+        self.requests = []
+        self.launched = [] # exec arguments, rules included; nothing is actually run
+        self._lock = threading.Lock()
+        self._runtime_dir = None
+        self._server = None
+        self._event_server = None
+        self._subscribers = []
+        self._pending_events = []
+
+    # Lifecycle
+
+    @property
+    def socket_path(self):
+        return os.path.join(self._runtime_dir, "hypr", self.signature, hyprland_ipc.SOCKET_NAME)
+
+    @property
+    def event_socket_path(self):
+        return os.path.join(self._runtime_dir, "hypr", self.signature, hyprland_ipc.EVENT_SOCKET_NAME)
+
+    def start(self):
+        self._runtime_dir = tempfile.mkdtemp(prefix="hyprhide-fake-")
+        os.makedirs(os.path.dirname(self.socket_path))
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen(16)
+        self._event_server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._event_server.bind(self.event_socket_path)
+        self._event_server.listen(16)
+        threading.Thread(target=self._serve, daemon=True).start()
+        threading.Thread(target=self._serve_events, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._event_server is not None:
+            self._event_server.close()
+            self._event_server = None
+        for conn in self._subscribers:
+            conn.close()
+        self._subscribers = []
+        if self._runtime_dir is not None:
+            shutil.rmtree(self._runtime_dir, ignore_errors=True)
+            self._runtime_dir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def env(self):
+        return {"XDG_RUNTIME_DIR": self._runtime_dir, "HYPRLAND_INSTANCE_SIGNATURE": self.signature}
+
+    def transport(self):
+        return hyprland_ipc.SocketTransport(self.socket_path)
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.requests = []
+
+    def _serve(self):
+        while self._server is not None:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with conn:
+                message = conn.recv(65536).decode()
+                if self.latency:
+                    time.sleep(self.latency)
+                with self._lock:
+                    self.request_count += 1
+                    self.requests.append(message)
+                    reply = self.handle(message)
+                conn.sendall(reply.encode())
+            self._flush_events()
+
+    def _serve_events(self):
+        while self._event_server is not None:
+            try:
+                conn, _ = self._event_server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._subscribers.append(conn)
+
+    def _emit(self, event, data):
+        self._pending_events.append(f"{event}>>{data}\n")
+
+    def _flush_events(self):
+        with self._lock:
+            payload, self._pending_events = "".join(self._pending_events), []
+            subscribers = list(self._subscribers)
+        if not payload:
+            return
+        for conn in subscribers:
+            try:
+                conn.sendall(payload.encode())
+            except OSError:
+                with self._lock:
+                    if conn in self._subscribers:
+                        self._subscribers.remove(conn)
+
+    # Simulated user actions
+
+    def open_window(self, client):
+        with self._lock:
+            self.clients.append(dict(client))
+            self._emit("openwindow", f"{client['address'][2:]},{client['workspace']['name']},"
+                                     f"{client['class']},{client['title']}")
+        self._flush_events()
+
+    def close_window(self, address):
+        with self._lock:
+            self.clients = [c for c in self.clients if c["address"] != address]
+            self._emit("closewindow", address[2:])
+        self._flush_events()
+
+    # Protocol
+
+    def handle(self, message):
+        if message.startswith(hyprland_ipc.BATCH_PREFIX):
+            commands = message[len(hyprland_ipc.BATCH_PREFIX):].split(";")
+            return "\n\n".join(self.handle(c.strip()) for c in commands if c.strip())
+        if message.startswith("j/"):
+            return json.dumps(self._query(message[2:].strip()))
+        name, _, args = message.partition(" ")
+        if name == "dispatch":
+            return self._dispatch(args.strip())
+        if name == "keyword":
+            return "ok"
+        return "unknown request"
+
+    def client(self, address):
+        for c in self.clients:
+            if c["address"] == address:
+                return c
+        return None
+
+    def _query(self, name):
+        if name == "clients":
+            return self.clients
+        if name == "activewindow":
+            return self.client(self.active_address) or {}
+        if name == "activeworkspace":
+            return self._workspace(self.active_workspace)
+        if name == "monitors":
+            return self.monitors
+        if name == "cursorpos":
+            return {"x": self.cursor[0], "y": self.cursor[1]}
+        if name == "workspaces":
+            ids = sorted({c["workspace"]["id"] for c in self.clients} | {self.active_workspace})
+            return [self._workspace(i) for i in ids]
+        return {}
+
+    def _workspace(self, workspace_id):
+        windows = [c for c in self.clients if c["workspace"]["id"] == workspace_id]
+        return {"id": workspace_id, "name": str(workspace_id), "monitor": self.monitors[0]["name"],
+                "windows": len(windows)}
+
+    def _target(self, selector):
+        selector = selector.strip()
+        if selector.startswith("address:"):
+            return self.client(selector[len("address:"):].strip())
+        if selector.startswith("pid:"):
+            pid = int(selector[len("pid:"):])
+            return next((c for c in self.clients if c["pid"] == pid), None)
+        return self.client(self.active_address)
+
+    def _dispatch(self, args):
+        dispatcher, _, rest = args.partition(" ")
+        params, _, selector = rest.partition(",")
+        window = self._target(selector if selector else params if params.startswith(("address:", "pid:")) else "")
+
+        if dispatcher == "workspace":
+            self._set_workspace(int(params))
+            return "ok"
+        if dispatcher == "exec":
+            self.launched.append(rest.strip())
+            return "ok"
+        if window is None:
+            return "No such window found"
+        if dispatcher == "focuswindow":
+            if window["workspace"]["id"] > 0:
+                self._set_workspace(window["workspace"]["id"])
+            if self.active_address != window["address"]:
+                self.active_address = window["address"]
+                self._emit("activewindow", f"{window['class']},{window['title']}")
+                self._emit("activewindowv2", window["address"][2:])
+        elif dispatcher in ("movetoworkspacesilent", "movetoworkspace"):
+            workspace = params.strip()
+            if workspace.startswith("special"):
+                name = workspace if ":" in workspace else "special:special"
+                window["workspace"] = {"id": -98, "name": name}
+            else:
+                window["workspace"] = {"id": int(workspace), "name": workspace}
+                if dispatcher == "movetoworkspace":
+                    self._set_workspace(int(workspace))
+            self._emit("movewindow", f"{window['address'][2:]},{window['workspace']['name']}")
+        elif dispatcher in ("togglefloating", "setfloating", "settiled"):
+            floating = {"togglefloating": not window["floating"], "setfloating": True, "settiled": False}[dispatcher]
+            if floating != window["floating"]:
+                window["floating"] = floating
+                self._emit("changefloatingmode", f"{window['address'][2:]},{int(floating)}")
+        elif dispatcher == "fullscreen":
+            window["fullscreen"] = 0 if window["fullscreen"] else 1
+        elif dispatcher in ("movewindowpixel", "moveactive"):
+            window["at"] = self._apply_pixels(window["at"], params)
+        elif dispatcher in ("resizewindowpixel", "resizeactive"):
+            window["size"] = self._apply_pixels(window["size"], params)
+        else:
+            return f"Invalid dispatcher {dispatcher}"
+        return "ok"
+
+    def _set_workspace(self, workspace_id):
+        if workspace_id != self.active_workspace:
+            self.active_workspace = workspace_id
+            self._emit("workspace", str(workspace_id))
+
+    def _apply_pixels(self, current, params):
+        parts = params.split()
+        if parts and parts[0] == "exact":
+            return [int(parts[1]), int(parts[2])]
+        return [current[0] + int(parts[0]), current[1] + int(parts[1])]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Hyprland socket")
+    parser.add_argument("--clients", type=int, default=5, help="Number of synthetic clients")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per request")
+    args = parser.parse_args()
+
+    fake = FakeHyprland(
+        clients=[make_client(f"0x{i + 1:x}", f"Window {i}", f"app{i % 3}", at=(i * 10, i * 10))
+                 for i in range(args.clients)],
+        latency=args.latency,
+    ).start()
+    for key, value in fake.env().items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
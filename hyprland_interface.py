@@ -1,133 +1,367 @@
-import os
-import subprocess
+import collections
 import json
+import os
 import time
+import hyprland_ipc
+import hyprhide_log
+import hyprhide_trace
+import window_record
+
+log = hyprhide_log.get_logger("interface")
+
+_transport = None
 
-def _run_command(command):
-    print(f"Running command: {command}")
+def set_transport(transport):
+    global _transport
+    _transport = transport
+    _snapshot.invalidate()
+
+def get_transport():
+    global _transport
+    if _transport is None:
+        _transport = hyprland_ipc.default_transport()
+    return _transport
+
+def _request(message):
+    log.debug("Running request: %s", message)
+    start = time.perf_counter()
     try:
-        result = subprocess.run(command.split(), capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Command failed: {e}")
+        reply = get_transport().request(message)
+    except hyprland_ipc.HyprlandIPCError as e:
+        hyprhide_trace.record_request(message, start, time.perf_counter(), ok=False)
+        log.warning("Request failed: %s", e)
         return ""
+    hyprhide_trace.record_request(message, start, time.perf_counter())
+    return reply
 
-def get_clients():
+def _query(name):
+    out = _request(f"j/{name}")
     try:
-        result = _run_command('hyprctl clients -j')
-        return json.loads(result)
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON: {e}")
-        return []
+        return window_record.loads(out)
+    except ValueError as e: # json and orjson decode errors are both ValueErrors
+        log.warning("Error decoding JSON: %s", e)
+        return None
+
+def _dispatch(args):
+    reply = _request(f"dispatch {args}")
+    _snapshot.invalidate()
+    return reply
+
+class ClientSnapshot:
+    # One "clients -j" result, parsed to WindowRecords and indexed by address
+    # and by (class, title).
+    # It is dropped whenever a dispatch goes out or after ttl seconds, so
+    # back to back lookups share a single round trip.
+    def __init__(self, ttl=0.5):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidate()
+
+    def invalidate(self):
+        self._clients = None
+        self._by_address = {}
+        self._by_class_title = {}
+        self._fetched_at = 0.0
+
+    def _ensure_fresh(self):
+        if self._clients is not None and time.monotonic() - self._fetched_at < self.ttl:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._clients = window_record.parse_clients(_query("clients"))
+        self._fetched_at = time.monotonic()
+        self._by_address = {c.address: c for c in self._clients}
+        self._by_class_title = {}
+        for c in self._clients:
+            self._by_class_title.setdefault((c.app_class, c.title), c)
+
+    def clients(self):
+        self._ensure_fresh()
+        return self._clients
+
+    def get(self, address):
+        self._ensure_fresh()
+        return self._by_address.get(address)
+
+    def find(self, title, app_class):
+        self._ensure_fresh()
+        return self._by_class_title.get((app_class, title))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+_snapshot = ClientSnapshot()
+
+def get_snapshot():
+    return _snapshot
+
+# Bounded condition waits, used instead of fixed sleeps after a dispatch.
+# wait_budget is the most we are willing to wait for the compositor to catch up.
+wait_budget = 0.5
+# (label, seconds waited, condition met) of the latest wait_until calls; bounded,
+# hyprhided runs for the whole session. wait_total is every wait's seconds summed.
+wait_log = collections.deque(maxlen=256)
+wait_total = 0.0
+_events = None # hyprland_events.EventListener of a process that keeps one (hyprhided)
+
+def set_wait_budget(seconds):
+    global wait_budget
+    wait_budget = seconds
+
+def set_event_listener(listener):
+    # With a running listener, waits re-check as soon as Hyprland reports a change
+    # (floating, workspace, focus...) instead of on the next backoff tick. Moves and
+    # resizes send no event, so the backoff still bounds every sleep.
+    global _events
+    _events = listener
+
+def _sleep_until_event(seen, seconds):
+    if _events is not None and _events.running:
+        _events.wait_for_event(seen, seconds)
+    else:
+        time.sleep(seconds)
+
+def wait_until(predicate, budget=None, label="condition", initial_interval=0.005, max_interval=0.05):
+    # Poll predicate() with exponential backoff until it is true or the budget runs out.
+    # Returns whether it was met.
+    global wait_total
+    budget = wait_budget if budget is None else budget
+    with hyprhide_trace.span(f"wait: {label}", "sleep") as waited:
+        start = time.monotonic()
+        deadline = start + budget
+        interval = initial_interval
+        seen = _events.events_seen if _events is not None else 0 # Before the check, so no event is missed
+        met = bool(predicate())
+        while not met and time.monotonic() < deadline:
+            _sleep_until_event(seen, min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(interval * 2, max_interval)
+            seen = _events.events_seen if _events is not None else 0
+            met = bool(predicate())
+        elapsed = time.monotonic() - start
+        waited.args["met"] = met
+    wait_log.append((label, elapsed, met))
+    wait_total += elapsed
+    log.debug("Waited %.1f ms for %s (%s)", elapsed * 1000, label, "ok" if met else "timed out")
+    return met
+
+def wait_for_client(address, check, budget=None, label=None):
+    # Wait until check(client) holds for the window, re-reading it on every poll
+    def predicate():
+        _snapshot.invalidate()
+        client = _snapshot.get(address)
+        return client is not None and check(client)
+    return wait_until(predicate, budget, label or f"{address} state")
+
+class DispatchBatch:
+    # Collects dispatches and sends them to Hyprland as a single [[BATCH]] request.
+    # Usable as a context manager; the batch is flushed when the block exits cleanly.
+    def __init__(self):
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, args):
+        self.commands.append(f"dispatch {args}")
+        return self
+
+    def focus_window(self, address):
+        return self.add(f"focuswindow address:{address}")
+
+    def set_current_workspace(self, workspace):
+        return self.add(f"workspace {workspace}")
+
+    def move_win_to_workspace(self, address, workspace):
+        return self.add(f"movetoworkspacesilent {workspace}, address:{address}")
+
+    def toggle_floating(self, address):
+        return self.add(f"togglefloating address:{address}")
+
+    def set_floating(self, address):
+        return self.add(f"setfloating address:{address}")
+
+    def set_tiling(self, address):
+        return self.add(f"settiled address:{address}")
+
+    def toggle_fullscreen(self):
+        return self.add("fullscreen 0")
+
+    def move_window_by(self, address, dx, dy):
+        return self.add(f"movewindowpixel {dx} {dy}, address:{address}")
+
+    def move_window_exact(self, address, x, y):
+        return self.add(f"movewindowpixel exact {x} {y}, address:{address}")
+
+    def resize_window_exact(self, address, width, height):
+        return self.add(f"resizewindowpixel exact {width} {height}, address:{address}")
+
+    def flush(self):
+        if not self.commands:
+            return []
+        commands, self.commands = self.commands, []
+        reply = _request(hyprland_ipc.BATCH_PREFIX + ";".join(commands))
+        _snapshot.invalidate()
+        return reply.split("\n\n")
+
+def get_clients():
+    return _snapshot.clients()
 
 def get_client_info(address: str):
-    clients = get_clients()
-    for client in clients:
-        if client.get("address") == address:
-            return client
-    print(f"No client found with address: {address}")
-    return None
+    client = _snapshot.get(address)
+    if client is None:
+        log.debug("No client found with address: %s", address)
+    return client
+
+def get_active_client():
+    return window_record.parse_client(_query("activewindow"))
 
 def get_active_window():
-    out = _run_command("hyprctl activewindow -j")
-    try:
-        j = json.loads(out)
-        return j.get("address", "")
-    except Exception as e:
-        print(f"Error getting active window: {e}")
+    client = get_active_client()
+    if client is None:
         return ""
+    return client.address
+
 def get_window_by_class_and_title(title,class_in):
-    clients = get_clients()
-    for client in clients:
-        if client.get("title") == title and client.get("class") == class_in:
-            return client
+    return _snapshot.find(title, class_in)
 def set_active_client(address, max_count=10):
-    count = 0
-    # while get_active_window() != address and count < max_count:
-    _run_command(f"hyprctl dispatch focuswindow address:{address}")
-        # time.sleep(0.05)  # tiny wait
-        # count += 1
-    # return count < max_count
+    _dispatch(f"focuswindow address:{address}")
 
 def move_window_local(address, target_x, target_y):
     info = get_client_info(address)
     if not info:
-        print("Could not get window info.")
+        log.warning("Could not get window info.")
         return
 
-    current_pos = info.get("at", [0, 0])
-    dx = target_x - current_pos[0]
-    dy = target_y - current_pos[1]
+    dx = target_x - info.x
+    dy = target_y - info.y
 
-    print(f"Moving window by offset dx={dx}, dy={dy}")
+    log.debug("Moving window by offset dx=%s, dy=%s", dx, dy)
     set_floating(address=address)
-    _run_command(f"hyprctl dispatch movewindowpixel {dx} {dy}, address:{address}")
-    new_info =  get_client_info(address)
-    pos = info.get("at", [0, 0])
-    print(f"Window position: {pos[0]}:{pos[1]}")
+    _dispatch(f"movewindowpixel {dx} {dy}, address:{address}")
+    log.debug("Window position: %s:%s", info.x, info.y)
 
 def move_window_global(address, target_x, target_y,workspace_id):
     info = get_client_info(address)
     if not info:
-        print("Could not get window info.")
+        log.warning("Could not get window info.")
         return
 
-    current_pos = info.get("at", [0, 0])
-    dx = target_x - current_pos[0]
-    dy = target_y - current_pos[1]
+    dx = target_x - info.x
+    dy = target_y - info.y
 
-    print(f"Moving window by offset dx={dx}, dy={dy}")
+    log.debug("Moving window by offset dx=%s, dy=%s", dx, dy)
     set_floating(address=address)
-    print("workspace_id",workspace_id)
+    log.debug("workspace_id %s", workspace_id)
     set_active_client(address=address)
     move_win_to_workspace(address,workspace_id)
-    # set_current_workspace(workspace_id)
-    _run_command(f"hyprctl dispatch movewindowpixel {dx} {dy}, address:{address}")
+    _dispatch(f"movewindowpixel {dx} {dy}, address:{address}")
     new_info =  get_client_info(address)
-    pos = info.get("at", [0, 0])
-    print(f"Window workspace: {new_info.get('workspace')}")
-    print(f"Window position: {pos[0]}:{pos[1]}")
+    if new_info is not None:
+        log.debug("Window workspace: %s", new_info.workspace)
+    log.debug("Window position: %s:%s", info.x, info.y)
 
 def toggle_floating(address):
-    _run_command(f"hyprctl dispatch togglefloating address:{address}")
+    _dispatch(f"togglefloating address:{address}")
 
 def set_floating(address):
     window_data = get_client_info(address=address)
-    is_floating = window_data['floating']
+    is_floating = window_data.floating
     if(is_floating == False):
         toggle_floating(address=address)
         window_data = get_client_info(address=address)
-        return window_data['floating'] == True
+        return window_data.floating == True
     else:
         return True
 def set_tiling(address):
     window_data = get_client_info(address=address)
-    is_floating = window_data['floating']
+    is_floating = window_data.floating
     if(is_floating == True):
         toggle_floating(address=address)
         window_data = get_client_info(address=address)
-        return window_data['floating'] == False
+        return window_data.floating == False
     else:
         return True
 
 def set_current_workspace(workspace:int):
-    _run_command(f"hyprctl dispatch workspace {workspace}")
+    _dispatch(f"workspace {workspace}")
 
 def focus_window(address):
-    _run_command(f"hyprctl dispatch focuswindow address:{address}")
+    _dispatch(f"focuswindow address:{address}")
 
 def move_win_to_workspace(address,workspace):
-    _run_command(f"hyprctl dispatch movetoworkspacesilent {workspace}, address:{address}")
+    _dispatch(f"movetoworkspacesilent {workspace}, address:{address}")
+
+def toggle_fullscreen():
+    _dispatch("fullscreen 0") # Acts on the active window
+
+def move_active(x, y):
+    _dispatch(f"moveactive {x} {y}")
 
 def get_active_workspace():
-    return json.loads(_run_command("hyprctl activeworkspace -j"))
+    return window_record.parse_workspace(_query("activeworkspace"))
 def get_active_workspace_id():
     workspace_info = get_active_workspace()
-    print("workspace_info",workspace_info)
-    workspace_id = workspace_info["id"]
-    return workspace_id
+    log.debug("workspace_info %s", workspace_info)
+    return workspace_info.id if workspace_info else 1
+
+def get_monitors():
+    return window_record.parse_monitors(_query("monitors"))
+
+# Monitor geometry only changes when a monitor is added, removed or reconfigured,
+# so it is kept on disk for the Hyprland session (keyed by instance signature)
+# and finding parked windows doesn't need a monitors query. hyprhided refreshes
+# it on monitor and config reload events.
+# focused/active_workspace change all the time and aren't kept.
+MONITOR_CACHE_PATH = os.path.expanduser("~/.cache/hyprhide/monitors.json")
+_LAYOUT_FIELDS = ("id", "name", "x", "y", "width", "height", "scale")
+
+def get_monitor_layout(refresh=False):
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE", "")
+    if not refresh:
+        try:
+            with open(MONITOR_CACHE_PATH) as f:
+                cached = window_record.loads(f.read())
+            if cached.get("signature") == signature and cached.get("monitors"):
+                return [window_record.Monitor(**m) for m in cached["monitors"]]
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass # Missing or unreadable, ask Hyprland
+    monitors = get_monitors()
+    if monitors:
+        try:
+            os.makedirs(os.path.dirname(MONITOR_CACHE_PATH), exist_ok=True)
+            with open(MONITOR_CACHE_PATH, "w") as f:
+                json.dump({"signature": signature,
+                           "monitors": [{k: getattr(m, k) for k in _LAYOUT_FIELDS} for m in monitors]}, f)
+        except OSError as e:
+            log.debug("Could not cache monitor layout: %s", e)
+    return monitors
+
+def get_cursor_pos():
+    pos = _query("cursorpos") or {}
+    return pos.get("x", 0), pos.get("y", 0)
+
+def exec_with_rules(command, rules):
+    # Launch command with window rules that apply to the window it opens and to
+    # nothing else, e.g. ["float", "move 10 20"]. Rules are ; separated, so this
+    # can't go in a DispatchBatch. Returns Hyprland's reply ("ok" on success).
+    return _dispatch(f"exec [{';'.join(rules)}] {command}")
+
+def get_focused_monitor_geometry():
+    # The focused Monitor (its active_workspace included)
+    for monitor in get_monitors():
+        if monitor.focused:
+            return monitor
+    return window_record.Monitor()  # fallback, 1920x1080 at 0,0
 
 
 # hyprctl dispatch focuswindow address:0x56090b1d8c20
 # hyprctl dispatch movetoworkspacesilent 1,address:0x56090b1d8c20
-# hyprctl dispatch movewindowpixel 0 0, address:0x56090b1d8c20
\ No newline at end of file
+# hyprctl dispatch movewindowpixel 0 0, address:0x56090b1d8c20
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Low level transports for talking to Hyprland.
+#
+# Hyprland listens on $XDG_RUNTIME_DIR/hypr/$HYPRLAND_INSTANCE_SIGNATURE/.socket.sock.
+# A request is a single message ("j/clients", "dispatch focuswindow address:0x..",
+# "[[BATCH]]dispatch a;dispatch b") and the compositor answers then closes the
+# connection. That is exactly what hyprctl does, minus the fork/exec.
+import os
+import socket
+
+SOCKET_NAME = ".socket.sock"
+EVENT_SOCKET_NAME = ".socket2.sock"
+BATCH_PREFIX = "[[BATCH]]"
+
+
+class HyprlandIPCError(Exception):
+    pass
+
+
+def instance_dir():
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    path = os.path.join(runtime_dir, "hypr", signature)
+    if os.path.isdir(path):
+        return path
+    legacy_path = os.path.join("/tmp/hypr", signature) # Hyprland < 0.40 kept its sockets in /tmp
+    if os.path.isdir(legacy_path):
+        return legacy_path
+    return path
+
+
+def socket_path(name=SOCKET_NAME):
+    directory = instance_dir()
+    if directory is None:
+        return None
+    return os.path.join(directory, name)
+
+
+class SocketTransport:
+    def __init__(self, path=None, timeout=2.0):
+        self.path = path or socket_path()
+        self.timeout = timeout
+
+    def request(self, message):
+        if not self.path:
+            raise HyprlandIPCError("HYPRLAND_INSTANCE_SIGNATURE is not set")
+        chunks = []
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.path)
+                sock.sendall(message.encode())
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+        except OSError as e:
+            raise HyprlandIPCError(f"{self.path}: {e}") from e
+        return b"".join(chunks).decode(errors="replace")
+
+
+class HyprctlTransport:
+    # Fallback for setups where the socket can't be reached directly
+    def __init__(self, binary="hyprctl"):
+        self.binary = binary
+
+    def request(self, message):
+        import subprocess # Only needed on this slow path, keeps the socket path import light
+        if message.startswith(BATCH_PREFIX):
+            args = [self.binary, "--batch", message[len(BATCH_PREFIX):]]
+        elif message.startswith("j/"):
+            args = [self.binary, "-j", *message[2:].split()]
+        else:
+            args = [self.binary, *message.split()]
+        try:
+            result = subprocess.run(args, capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise HyprlandIPCError(str(e)) from e
+        return result.stdout
+
+
+def default_transport():
+    path = socket_path()
+    if path and os.path.exists(path):
+        return SocketTransport(path)
+    return HyprctlTransport()
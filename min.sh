@@ -1,2 +1,5 @@
 #!/bin/bash
-python /usr/share/hyprhide/min.py
\ No newline at end of file
+# Ask the resident daemon first, fall back to a one-shot hide if it isn't running
+python3 -S /usr/share/hyprhide/hyprhidectl.py hide >/dev/null
+[ $? -eq 3 ] && exec python /usr/share/hyprhide/min.py "$@"
+exit 0
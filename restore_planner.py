@@ -0,0 +1,66 @@
+# Restore planning: the dispatches that take a hidden window from the state it
+# is in now back to the state it was hidden from, and nothing more.
+#
+# A hidden window is usually most of the way back already (on special:hyprhide
+# it kept its floating state and geometry, offscreen it kept its workspace), so
+# comparing the live WindowRecord with the saved one and emitting only what
+# differs leaves a few dispatches instead of a fixed toggle/move/re-check
+# sequence. Steps go in the order Hyprland needs them: out of fullscreen, onto
+# the workspace, absolute position and size (movewindowpixel exact, never a
+# dx/dy from a possibly stale position), then the saved layout mode.
+# focuswindow goes last and brings the workspace up with it.
+#
+# A plan is an unsent DispatchBatch: the caller sends it, merges several into
+# one request, or prints batch.commands for a dry run.
+from hyprland_interface import DispatchBatch
+
+
+def add_steps(batch, current, target, workspace):
+    # Append the steps for one window, without the final focus, to batch
+    address = target.address
+    if current.fullscreen and not target.fullscreen:
+        batch.focus_window(address) # fullscreen acts on the focused window
+        batch.toggle_fullscreen()
+    if current.workspace != workspace:
+        batch.move_win_to_workspace(address, workspace)
+    if target.floating:
+        if not current.floating:
+            batch.set_floating(address) # Hyprland picks a floating position, so always place it below
+        if not current.floating or current.at != target.at:
+            batch.move_window_exact(address, target.x, target.y)
+        if target.width and target.height and (not current.floating or current.size != target.size):
+            batch.resize_window_exact(address, target.width, target.height)
+    elif current.floating:
+        if current.at != target.at:
+            batch.move_window_exact(address, target.x, target.y) # On screen even if the tile doesn't take
+        batch.set_tiling(address) # The layout decides where it ends up
+    return batch
+
+
+def plan(current, target, workspace):
+    # current: the live (or expected) WindowRecord, target: the saved one,
+    # workspace: where it goes (target.workspace unless that is unknown)
+    batch = add_steps(DispatchBatch(), current, target, workspace)
+    batch.focus_window(target.address)
+    return batch
+
+
+GEOMETRY_TOLERANCE = 2 # px; with fractional scaling a logical position can come back rounded
+
+
+def _near(a, b):
+    return all(abs(p - q) <= GEOMETRY_TOLERANCE for p, q in zip(a, b))
+
+
+def satisfied(client, target, workspace):
+    # The end state a plan is verified against. A floating window must also be
+    # back at its position and size: exact moves and resizes aren't clamped
+    # (parking offscreen relies on that), so a bigger difference than rounding
+    # means a dispatch didn't take. A tiled window's geometry is the layout's.
+    if client.workspace != workspace or client.floating != target.floating:
+        return False
+    if not target.floating:
+        return True
+    if not _near(client.at, target.at):
+        return False
+    return not (target.width and target.height) or _near(client.size, target.size)
@@ -0,0 +1,140 @@
+# Offscreen smoke test for the picker: open it over a populated index against
+# hyprland_fake and let it paint, decode thumbnails and filter.
+#
+#   python -m pytest -q test_gui.py
+import os
+import sys
+import tempfile
+import time
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="hyprhide-test-home-") # Before anything reads HIDE_DIR
+os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+pytest.importorskip("commentjson")
+
+from PyQt6.QtGui import QColor, QImage
+from PyQt6.QtWidgets import QApplication
+import HyprHideGui
+import hide_store
+import hyprland_fake
+import hyprland_interface
+import hyprhide_ops
+import thumbnails
+
+WINDOWS = 12
+
+
+@pytest.fixture
+def fake():
+    clients = [hyprland_fake.make_client(f"0x{i + 1:x}00", f"Window {i}", f"app{i % 3}", at=(40 * i, 30 * i))
+               for i in range(WINDOWS)]
+    fake = hyprland_fake.FakeHyprland(clients=clients).start()
+    os.environ.update(fake.env())
+    hyprland_interface.set_transport(fake.transport())
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def errors(monkeypatch):
+    # PyQt6 aborts on an exception raised from a virtual (data(), paint()...);
+    # collect them instead so the test can fail with the traceback
+    caught = []
+    monkeypatch.setattr(sys, "excepthook", lambda *exc: caught.append(exc))
+    return caught
+
+
+def hide_all(fake):
+    hidden = hyprhide_ops.hide_many(hyprland_interface.get_clients())
+    store = hide_store.get_store(HyprHideGui.HIDE_DIR)
+    for address in hidden:
+        image = QImage(thumbnails.THUMB_SIZE[0], thumbnails.THUMB_SIZE[1], QImage.Format.Format_RGB32)
+        image.fill(QColor("#3070b0"))
+        name = thumbnails.thumbnail_name(address)
+        image.save(os.path.join(store.hide_dir, name), "PPM")
+        store.set_thumbnail(address, name)
+    return hidden
+
+
+def process_until(app, done, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return done()
+
+
+def test_populated_picker_paints_and_filters(fake, errors):
+    app = QApplication.instance() or QApplication([])
+    hidden = hide_all(fake)
+    assert len(hidden) == WINDOWS
+
+    HyprHideGui.reconcile_hidden()
+    window = HyprHideGui.HyprHideApp()
+    try:
+        window.show()
+        loader = window.thumbnail_loader
+        assert window.model.rowCount() == WINDOWS
+        assert process_until(app, lambda: loader.visible_addresses() and all(
+            loader.pixmap(window.model.record(row)) is not None for row in range(window.model.rowCount())
+            if window.model.record(row).address in loader.visible_addresses()))
+        assert not errors, errors
+
+        window.filter_items("window 1")
+        app.processEvents()
+        assert window.model.rowCount() >= 1
+        assert window.model.record(0).title == "Window 1"
+        assert not errors, errors
+    finally:
+        window.hide()
+        window.restore_worker.stop()
+        window.deleteLater()
+        app.processEvents()
+
+
+def test_resident_picker_parks_on_close_and_reopens_on_request(fake, errors, tmp_path):
+    import threading
+    app = QApplication.instance() or QApplication([])
+    hide_all(fake)
+    picker = hyprland_fake.make_client("0xfff0", "HyprHide", "hyprhide", at=(300, 200), size=hyprhide_ops.PICKER_SIZE,
+                                       floating=True, pid=os.getpid())
+    fake.clients.append(picker)
+    window = HyprHideGui.HyprHideApp()
+    server = HyprHideGui.ReopenServer(window, str(tmp_path / "gui.sock"))
+    try:
+        assert server.listen() and window.resident
+        window.show()
+        window.search_bar.setText("window 1")
+        window.filter_items("window 1")
+        window.close()
+        assert window.parked and window.isVisible() # Parked, not quit or unmapped
+        assert fake.client("0xfff0")["workspace"]["name"] == hyprhide_ops.PICKER_WORKSPACE
+
+        fake.open_window(hyprland_fake.make_client("0xabc0", "Hidden since", "late"))
+        hyprhide_ops.hide_many([hyprland_interface.get_client_info("0xabc0")])
+        replies = []
+        request = threading.Thread(target=lambda: replies.append(
+            hyprhide_ops.raise_picker((40, 60), path=server.path)))
+        request.start()
+        assert process_until(app, lambda: replies)
+        request.join()
+        assert replies == [True]
+        assert not window.parked and window.search_bar.text() == ""
+        assert window.model.rowCount() == WINDOWS + 1 # Reloaded, including the window hidden meanwhile
+        assert fake.client("0xfff0")["workspace"]["id"] == fake.active_workspace
+        assert fake.client("0xfff0")["at"] == [40, 60]
+        assert not errors, errors
+    finally:
+        server.server.close()
+        window.resident = False
+        window.hide()
+        window.restore_worker.stop()
+        window.deleteLater()
+        app.processEvents()
+
+
+def test_raise_picker_without_a_resident_picker(tmp_path):
+    assert hyprhide_ops.raise_picker(path=str(tmp_path / "nobody.sock")) is False
@@ -0,0 +1,53 @@
+# hyprhide_config.get(): parsed once per file and mtime, typed with defaults
+# for missing or invalid values.
+#
+#   python -m pytest -q test_hyprhide_config.py
+import os
+import hyprhide_config
+
+
+def write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_cached_until_the_mtime_moves(tmp_path):
+    path = tmp_path / "config.cfg"
+    write(path, "[GUI]\nthumbnails = true\n", 1_000_000_000)
+    paths = (str(path),)
+    config = hyprhide_config.get(paths)
+    assert config.thumbnails is True
+    assert hyprhide_config.get(paths) is config
+
+    write(path, "[GUI]\nthumbnails = false\n", 1_000_000_000) # Same mtime: not re-read
+    assert hyprhide_config.get(paths) is config
+
+    write(path, "[GUI]\nthumbnails = false\n", 2_000_000_000)
+    reloaded = hyprhide_config.get(paths)
+    assert reloaded is not config and reloaded.thumbnails is False
+
+
+def test_first_existing_path_wins(tmp_path):
+    second = tmp_path / "second.cfg"
+    write(second, "[HIDE]\nbackend = special\n", 1_000_000_000)
+    config = hyprhide_config.get((str(tmp_path / "missing.cfg"), str(second)))
+    assert config.path == str(second) and config.backend == "special"
+
+
+def test_invalid_values_fall_back_to_defaults(tmp_path):
+    path = tmp_path / "config.cfg"
+    write(path, "[GUI]\nx_offset = left\n[HIDE]\nbackend = minimize\n", 1_000_000_000)
+    config = hyprhide_config.get((str(path),))
+    assert config.x_offset == -240
+    assert config.backend == "offscreen"
+
+
+def test_save_is_seen_by_the_next_get(tmp_path):
+    path = str(tmp_path / "config.cfg")
+    hyprhide_config.ensure_user_config(path)
+    assert hyprhide_config.get((path,)).thumbnail_cache_mb == 32
+    parser = hyprhide_config.editable(path)
+    parser["GUI"] = {"thumbnail_cache_mb": "8"}
+    hyprhide_config.save(parser, path)
+    os.utime(path, ns=(os.stat(path).st_mtime_ns,) * 2) # Even if the write kept the old mtime
+    assert hyprhide_config.get((path,)).thumbnail_cache_mb == 8
@@ -0,0 +1,68 @@
+# restore_planner: only the dispatches a window's state needs, in the order
+# Hyprland needs them, and the end state a restore is verified against.
+#
+#   python -m pytest -q test_restore_planner.py
+import restore_planner
+from window_record import WindowRecord
+
+ADDRESS = "0x1000"
+
+
+def record(**fields):
+    values = dict(address=ADDRESS, x=100, y=80, width=800, height=600, workspace=2, floating=True)
+    values.update(fields)
+    return WindowRecord(**values)
+
+
+def test_plan_for_a_window_already_in_place_only_focuses():
+    target = record()
+    assert restore_planner.plan(target, target, 2).commands == [f"dispatch focuswindow address:{ADDRESS}"]
+
+
+def test_plan_for_a_parked_floating_window_moves_it_back():
+    parked = record(x=5000, y=5000, workspace=2)
+    assert restore_planner.plan(parked, record(), 2).commands == [
+        f"dispatch movewindowpixel exact 100 80, address:{ADDRESS}",
+        f"dispatch focuswindow address:{ADDRESS}",
+    ]
+
+
+def test_plan_orders_fullscreen_workspace_float_move_resize():
+    current = record(x=0, y=0, width=1920, height=1080, workspace=5, floating=False, fullscreen=1)
+    assert restore_planner.plan(current, record(), 2).commands == [
+        f"dispatch focuswindow address:{ADDRESS}",
+        "dispatch fullscreen 0",
+        f"dispatch movetoworkspacesilent 2, address:{ADDRESS}",
+        f"dispatch setfloating address:{ADDRESS}",
+        f"dispatch movewindowpixel exact 100 80, address:{ADDRESS}",
+        f"dispatch resizewindowpixel exact 800 600, address:{ADDRESS}",
+        f"dispatch focuswindow address:{ADDRESS}",
+    ]
+
+
+def test_plan_for_a_tiled_window_leaves_geometry_to_the_layout():
+    parked = record(x=5000, y=5000, floating=True)
+    assert restore_planner.plan(parked, record(floating=False), 2).commands == [
+        f"dispatch movewindowpixel exact 100 80, address:{ADDRESS}",
+        f"dispatch settiled address:{ADDRESS}",
+        f"dispatch focuswindow address:{ADDRESS}",
+    ]
+
+
+def test_satisfied_needs_workspace_and_layout_mode():
+    target = record()
+    assert restore_planner.satisfied(target, target, 2)
+    assert not restore_planner.satisfied(record(workspace=3), target, 2)
+    assert not restore_planner.satisfied(record(floating=False), target, 2)
+
+
+def test_satisfied_checks_floating_geometry_within_rounding():
+    target = record()
+    assert restore_planner.satisfied(record(x=101, y=79, width=799), target, 2)
+    assert not restore_planner.satisfied(record(x=5000, y=5000), target, 2) # Still parked
+    assert not restore_planner.satisfied(record(width=400), target, 2)
+
+
+def test_satisfied_ignores_tiled_geometry():
+    target = record(floating=False)
+    assert restore_planner.satisfied(record(floating=False, x=0, y=0, width=960), target, 2)
@@ -0,0 +1,49 @@
+# thumbnails.ThumbnailCache: least recently used thumbnails go first once the
+# total size passes max_bytes.
+#
+#   python -m pytest -q test_thumbnails.py
+import thumbnails
+from window_record import WindowRecord
+
+
+def test_evicts_least_recently_used_first():
+    cache = thumbnails.ThumbnailCache(300)
+    for key in "abc":
+        cache.put(key, key.upper(), 100)
+    assert cache.get("a") == "A" # Now the most recently used
+    cache.put("d", "D", 100)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert cache.bytes == 300 and cache.evictions == 1
+
+
+def test_replacing_a_key_counts_its_size_once():
+    cache = thumbnails.ThumbnailCache(300)
+    cache.put("a", "old", 200)
+    cache.put("a", "new", 50)
+    assert cache.bytes == 50 and len(cache) == 1
+    assert cache.get("a") == "new"
+
+
+def test_item_bigger_than_the_cache_is_not_kept():
+    cache = thumbnails.ThumbnailCache(100)
+    cache.put("a", "A", 50)
+    cache.put("b", "B", 101)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.bytes == 50
+
+
+def test_stats_and_clear():
+    cache = thumbnails.ThumbnailCache(100)
+    cache.put("a", "A", 10)
+    cache.get("a")
+    cache.get("missing")
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "items": 1, "bytes": 10, "max_bytes": 100}
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_cache_key_changes_when_a_window_is_hidden_again():
+    first = WindowRecord("0x1", hidden_at=1.0)
+    again = WindowRecord("0x1", hidden_at=2.0)
+    assert thumbnails.cache_key(first) != thumbnails.cache_key(again)
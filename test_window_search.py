@@ -0,0 +1,56 @@
+# window_search: substring and fuzzy matching over normalized fields, ranked
+# so that better hits come first.
+#
+#   python -m pytest -q test_window_search.py
+import window_search
+from window_record import WindowRecord
+
+RECORDS = [
+    WindowRecord("0x1", title="Mozilla Firefox", app_class="firefox", workspace=1),
+    WindowRecord("0x2", title="notes.txt - Kate", app_class="org.kde.kate", workspace=2),
+    WindowRecord("0x3", title="Résumé.pdf", app_class="okular", workspace=3),
+    WindowRecord("0x4", title="fix firefox crash - Terminal", app_class="kitty", workspace=1),
+]
+
+
+def titles(index, query):
+    return [RECORDS[row].title for row in index.search(query)]
+
+
+def test_empty_query_keeps_the_original_order():
+    assert window_search.SearchIndex(RECORDS).search("  ") == [0, 1, 2, 3]
+
+
+def test_title_and_class_hit_beats_title_only():
+    assert titles(window_search.SearchIndex(RECORDS), "firefox") == ["Mozilla Firefox", "fix firefox crash - Terminal"]
+
+
+def test_fuzzy_subsequence_matches():
+    assert titles(window_search.SearchIndex(RECORDS), "mzf") == ["Mozilla Firefox"]
+
+
+def test_accents_and_case_are_ignored():
+    assert titles(window_search.SearchIndex(RECORDS), "RESUME") == ["Résumé.pdf"]
+
+
+def test_every_term_must_match():
+    index = window_search.SearchIndex(RECORDS)
+    assert titles(index, "firefox kitty") == ["fix firefox crash - Terminal"]
+    assert titles(index, "firefox okular") == []
+
+
+def test_workspace_is_searchable():
+    assert titles(window_search.SearchIndex(RECORDS), "ws2") == ["notes.txt - Kate"]
+
+
+def test_narrowing_and_widening_give_the_same_rows_as_a_fresh_search():
+    index = window_search.SearchIndex(RECORDS)
+    for query in ("k", "ka", "kat", "ka", "", "kate"):
+        assert index.search(query) == window_search.SearchIndex(RECORDS).search(query)
+
+
+def test_rebuild_replaces_the_rows():
+    index = window_search.SearchIndex(RECORDS)
+    index.search("fire")
+    index.rebuild(RECORDS[:1])
+    assert index.search("fire") == [0]
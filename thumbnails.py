@@ -0,0 +1,132 @@
+# Window thumbnails.
+#
+# The GUI only ever shows a THUMB_SIZE preview, so hide asks grim for exactly
+# that (grim -s scales while capturing) and writes it as PPM: a raw bitmap that
+# decodes with no decompression. The full resolution PNG is only captured when
+# [GUI] full_capture is on. Older hides that only have <address>.png get their
+# thumbnail made once, the first time the GUI needs it.
+#
+# Decoded thumbnails are kept in a ThumbnailCache for the life of the process,
+# so a picker opened again in the same process paints from memory.
+import os
+import hyprhide_log
+
+_log = hyprhide_log.get_logger("thumbnails")
+
+THUMB_SIZE = (140, 105) # Card preview size in the GUI
+
+
+def thumbnail_name(address):
+    return f"{address}.thumb.ppm"
+
+
+def full_capture_name(address):
+    return f"{address}.png"
+
+
+def thumb_scale(width, height):
+    return min(THUMB_SIZE[0] / max(width, 1), THUMB_SIZE[1] / max(height, 1), 1.0)
+
+
+def capture(address, geometry, hide_dir, full_capture=False, log=_log.info):
+    # geometry is (x, y, w, h) in layout pixels. Returns the thumbnail file name or None.
+    import subprocess # Deferred, hiding without thumbnails never spawns anything
+    x, y, w, h = geometry
+    region = f"{x},{y} {w}x{h}"
+    thumb = thumbnail_name(address)
+    result = subprocess.run(
+        ["grim", "-g", region, "-s", f"{thumb_scale(w, h):.4f}", "-t", "ppm", os.path.join(hide_dir, thumb)],
+        stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
+        log(f"grim failed to capture {region}")
+        return None
+    log(f"Thumbnail saved to {thumb}")
+    if full_capture:
+        subprocess.run(["grim", "-g", region, os.path.join(hide_dir, full_capture_name(address))],
+                       stderr=subprocess.DEVNULL)
+    return thumb
+
+
+def ensure_thumbnail(store, record):
+    # Path of a display sized thumbnail for record, making it from a legacy full
+    # capture if that is all there is. Needs Qt, so only the GUI calls this.
+    path = store.thumbnail_path(record)
+    if path and os.path.exists(path) and path.endswith(".ppm"):
+        return path
+    source = path if path and os.path.exists(path) else os.path.join(store.hide_dir, full_capture_name(record.address))
+    if not os.path.exists(source):
+        return None
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage
+    image = QImage(source)
+    if image.isNull():
+        return None
+    thumb = thumbnail_name(record.address)
+    image.scaled(THUMB_SIZE[0], THUMB_SIZE[1], Qt.AspectRatioMode.KeepAspectRatio,
+                 Qt.TransformationMode.SmoothTransformation).save(os.path.join(store.hide_dir, thumb), "PPM")
+    store.set_thumbnail(record.address, thumb)
+    return os.path.join(store.hide_dir, thumb)
+
+
+def cache_key(record):
+    # hidden_at is when the thumbnail was captured; a re-hide of the same window gets a new key
+    return (record.address, record.hidden_at)
+
+
+class ThumbnailCache:
+    # Decoded thumbnails by cache_key(), least recently used evicted first once
+    # their total size passes max_bytes. Not thread safe: the GUI only touches
+    # it from the GUI thread.
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = {} # key -> (image, nbytes), oldest use first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        item = self._items.pop(key, None)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items[key] = item # Move to the most recently used end
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, image, nbytes):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        if nbytes > self.max_bytes:
+            return
+        self._items[key] = (image, nbytes)
+        self.bytes += nbytes
+        self._evict()
+
+    def clear(self):
+        self._items = {}
+        self.bytes = 0
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._items:
+            key = next(iter(self._items))
+            self.bytes -= self._items.pop(key)[1]
+            self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "items": len(self._items), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+
+def remove(address, hide_dir):
+    for name in (thumbnail_name(address), full_capture_name(address)):
+        path = os.path.join(hide_dir, name)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            _log.warning("Failed to remove %s: %s", path, e)
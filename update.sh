@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Copy source files
-cp /mnt/MyCodeProjects/hyprlandhide/{PKGBUILD,LICENSE,min.sh,HyprHideGui.py,hyprland_interface.py,HyprHideDev.py,config.cfg,min.py,version.txt} ~/aur-hyprhide/
+cp /mnt/MyCodeProjects/hyprlandhide/{PKGBUILD,LICENSE,min.sh,HyprHideGui.py,hyprland_interface.py,HyprHideDev.py,config.cfg,min.py,version.txt,hyprland_ipc.py,hyprhide_ops.py,hyprland_events.py,hyprhide.py,hyprhided.py,hyprhidectl.py,hide_store.py,thumbnails.py,window_search.py,hyprhide_trace.py,hyprhide_log.py,window_record.py,restore_planner.py,hyprhide_config.py,hyprhide_waybar.py} ~/aur-hyprhide/
 
 # Replace pkgver in PKGBUILD with version.txt
 VERSION=$(< /mnt/MyCodeProjects/hyprlandhide/version.txt)
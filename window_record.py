@@ -0,0 +1,146 @@
+# Typed, immutable views of what Hyprland reports, keeping only the fields
+# hyprhide uses. `clients -j` returns ~25 keys per window (and grows with every
+# Hyprland release); a WindowRecord holds 15 in __slots__, so hundreds of
+# windows cost a fraction of the dicts and lookups are plain attribute reads.
+#
+# These are hand-rolled rather than @dataclass(frozen=True, slots=True):
+# importing dataclasses pulls in inspect, ~15-20 ms that hyprhide-min can't
+# spare.
+import json
+
+# orjson parses a `clients -j` reply about 2.5x faster than json (0.5 vs 1.3 ms
+# for 200 windows), but importing it costs 12-25 ms, so it only pays off on
+# replies this large; below that, and when it isn't installed, json is used
+LARGE_REPLY = 1024 * 1024
+_fast_loads = None
+
+
+def loads(data):
+    global _fast_loads
+    if len(data) < LARGE_REPLY:
+        return json.loads(data)
+    if _fast_loads is None:
+        try:
+            import orjson
+            _fast_loads = orjson.loads
+        except ImportError:
+            _fast_loads = json.loads
+    return _fast_loads(data)
+
+
+class _Frozen:
+    __slots__ = ()
+    _defaults = {}
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.__slots__):
+            raise TypeError(f"{type(self).__name__} takes at most {len(self.__slots__)} arguments")
+        values = dict(self._defaults)
+        values.update(zip(self.__slots__, args))
+        for name, value in kwargs.items():
+            if name not in self.__slots__:
+                raise TypeError(f"{type(self).__name__} has no field {name!r}")
+            values[name] = value
+        for name in self.__slots__:
+            if name not in values:
+                raise TypeError(f"{type(self).__name__} is missing {name!r}")
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other._values() == self._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def replace(self, **changes):
+        return type(self)(**{**self.as_dict(), **changes})
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class WindowRecord(_Frozen):
+    # A window, live (from clients/activewindow) or hidden (from hide_store,
+    # which also fills hidden_at, thumbnail and the backend that hid it)
+    __slots__ = ("address", "title", "app_class", "x", "y", "width", "height", "workspace",
+                 "floating", "fullscreen", "mapped", "workspace_name", "hidden_at", "thumbnail", "backend")
+    _defaults = {"title": "", "app_class": "", "x": 0, "y": 0, "width": 0, "height": 0,
+                 "workspace": 1, "floating": False, "fullscreen": 0, "mapped": True,
+                 "workspace_name": "", "hidden_at": None, "thumbnail": None, "backend": None}
+
+    @property
+    def at(self):
+        return (self.x, self.y)
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    @property
+    def geometry(self):
+        return (self.x, self.y, self.width, self.height)
+
+    @classmethod
+    def from_hyprland(cls, client):
+        x, y = client.get("at") or (0, 0)
+        width, height = client.get("size") or (0, 0)
+        workspace = client.get("workspace") or {}
+        return cls(client["address"], client.get("title") or "", client.get("class") or "",
+                   x, y, width, height, workspace.get("id", 1),
+                   client.get("floating") is True, int(client.get("fullscreen") or 0),
+                   client.get("mapped", True), workspace.get("name", ""))
+
+
+class Monitor(_Frozen):
+    __slots__ = ("id", "name", "x", "y", "width", "height", "scale", "focused", "active_workspace")
+    _defaults = {"id": 0, "name": "", "x": 0, "y": 0, "width": 1920, "height": 1080, "scale": 1.0,
+                 "focused": False, "active_workspace": None}
+
+    @classmethod
+    def from_hyprland(cls, monitor):
+        return cls(monitor.get("id", 0), monitor.get("name", ""), monitor.get("x", 0), monitor.get("y", 0),
+                   monitor.get("width", 0), monitor.get("height", 0), monitor.get("scale", 1.0),
+                   monitor.get("focused", False), (monitor.get("activeWorkspace") or {}).get("id"))
+
+
+class Workspace(_Frozen):
+    __slots__ = ("id", "name", "monitor", "windows")
+    _defaults = {"name": "", "monitor": "", "windows": 0}
+
+    @classmethod
+    def from_hyprland(cls, workspace):
+        return cls(workspace["id"], workspace.get("name", ""), workspace.get("monitor", ""),
+                   workspace.get("windows", 0))
+
+
+def parse_clients(data):
+    return [WindowRecord.from_hyprland(c) for c in data or () if c.get("address")]
+
+
+def parse_client(data):
+    if not isinstance(data, dict) or not data.get("address"):
+        return None
+    return WindowRecord.from_hyprland(data)
+
+
+def parse_monitors(data):
+    return [Monitor.from_hyprland(m) for m in data or ()]
+
+
+def parse_workspace(data):
+    if not isinstance(data, dict) or "id" not in data:
+        return None
+    return Workspace.from_hyprland(data)
@@ -0,0 +1,99 @@
+# Search over the hidden window list.
+#
+# Titles, classes and workspaces are normalized once when the list is loaded
+# (casefolded, accents stripped, word starts found) so a keystroke only scores
+# precomputed strings. Each query term must match one field either as a
+# substring or as a fuzzy subsequence ("ffx" -> "firefox"); substring hits,
+# hits at word starts and runs of consecutive letters score higher, and title
+# beats class beats workspace. When the query only grows, the previous matches
+# are the only candidates, so typing narrows instead of rescanning.
+import unicodedata
+
+FIELD_WEIGHTS = (3, 2, 1) # title, class, workspace
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def _word_starts(text):
+    return {i for i, c in enumerate(text) if c.isalnum() and (i == 0 or not text[i - 1].isalnum())}
+
+
+def match_score(term, text, starts):
+    # Score of term against one normalized field, None if it doesn't match
+    index = text.find(term)
+    if index != -1:
+        score = 100 + 10 * len(term)
+        if index in starts:
+            score += 50
+        if index == 0:
+            score += 25
+        return score
+    # Fuzzy: every letter of term in order, leftmost placement
+    score = 0
+    pos = -1
+    for c in term:
+        found = text.find(c, pos + 1)
+        if found == -1:
+            return None
+        score += 1
+        if found == pos + 1:
+            score += 5 # Consecutive letters
+        if found in starts:
+            score += 8
+        pos = found
+    return score
+
+
+class _Entry:
+    __slots__ = ("fields",)
+
+    def __init__(self, record):
+        texts = (normalize(record.title), normalize(record.app_class), f"ws{record.workspace}")
+        self.fields = tuple((text, _word_starts(text)) for text in texts)
+
+    def score(self, terms):
+        total = 0
+        for term in terms:
+            best = None
+            for (text, starts), weight in zip(self.fields, FIELD_WEIGHTS):
+                score = match_score(term, text, starts)
+                if score is not None and (best is None or score * weight > best):
+                    best = score * weight
+            if best is None:
+                return None
+            total += best
+        return total
+
+
+class SearchIndex:
+    def __init__(self, records=()):
+        self.rebuild(records)
+
+    def rebuild(self, records):
+        self.entries = [_Entry(record) for record in records]
+        self._last_query = ""
+        self._last_rows = list(range(len(self.entries)))
+
+    def search(self, query):
+        # Rows (indexes into the records given to rebuild) that match query, best first.
+        # An empty query keeps the original order.
+        query = normalize(query).strip()
+        terms = query.split()
+        if not terms:
+            rows = list(range(len(self.entries)))
+            self._last_query, self._last_rows = "", rows
+            return rows
+        # A longer version of the last query can only match a subset of its rows
+        candidates = self._last_rows if self._last_query and query.startswith(self._last_query) else range(len(self.entries))
+        scored = []
+        for row in candidates:
+            score = self.entries[row].score(terms)
+            if score is not None:
+                scored.append((-score, row))
+        scored.sort()
+        rows = [row for _, row in scored]
+        self._last_query, self._last_rows = query, rows
+        return rows